@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+ECE2300 Lint Benchmark
+Times the preprocessor and the linter on synthetic designs of configurable size,
+generated from templates of the modules in mem/:
+
+    fsm       A deep case statement FSM (always_comb next state and output logic)
+    regfile   A wide RegfileFlat style register file (always_ff write, always_comb read)
+    netlist   A gate level _GL netlist of primitive gates
+    includes  A deep chain of include guarded files, each with a small module
+
+Every stage of the pipeline is timed (see lint/timing.py) and the throughput is
+reported in lines/sec and modules/sec. Results can be saved as a baseline and
+later runs compared against it, to check performance work offline:
+
+    % cd scripts
+    % python3 -m lint.benchmark --save-baseline baseline.json
+    % python3 -m lint.benchmark --baseline baseline.json
+"""
+
+import argparse
+import io
+import json
+import re
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Allow running this file directly as well as with `python3 -m lint.benchmark`
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from lint import preprocessor
+from lint.config import resolve_rule_sets
+from lint.timing import TIMINGS
+
+# Default size of each design, multiplied by --scale
+DEFAULT_SIZES = {
+    "fsm": 64,        # states
+    "regfile": 64,    # registers (32 bits each)
+    "netlist": 1000,  # gates
+    "includes": 40,   # files in the include chain
+}
+
+# A run slower than the baseline by more than this factor is a regression
+DEFAULT_TOLERANCE = 1.25
+
+MODULE_PATTERN = re.compile(r"^\s*module\s", re.MULTILINE)
+
+#--------------------
+# Design generators
+#--------------------
+# Each generator returns (files, top level file, {module name: rule set})
+
+def _test_bench(design_file: str) -> str:
+    """A test bench that asks for design_file to be linted, like the ones in mem/test."""
+    return (f"// ece2300-lint\n"
+            f"`include \"{design_file}\"\n\n"
+            f"module Top();\n"
+            f"endmodule\n")
+
+def generate_fsm(states: int):
+    """A Moore FSM whose next state and output logic is one case statement per state."""
+    name = f"FsmCase_{states}s_RTL"
+    bits = max(1, (states - 1).bit_length())
+    lines = [
+        f"`ifndef {name.upper()}",
+        f"`define {name.upper()}",
+        "",
+        f"module {name}",
+        "(",
+        "  (* keep=1 *) input  logic       clk,",
+        "  (* keep=1 *) input  logic       rst,",
+        "  (* keep=1 *) input  logic [1:0] in,",
+        "  (* keep=1 *) output logic [7:0] out",
+        ");",
+        "",
+        f"  logic [{bits - 1}:0] state;",
+        f"  logic [{bits - 1}:0] state_next;",
+        "",
+        "  always_ff @( posedge clk ) begin",
+        "    if ( rst )",
+        f"      state <= {bits}'d0;",
+        "    else",
+        "      state <= state_next;",
+        "  end",
+        "",
+        "  always_comb begin",
+        "    state_next = state;",
+        "    case ( state )",
+    ]
+    for s in range(states):
+        lines += [
+            f"      {bits}'d{s}: begin",
+            f"        if ( in == 2'd0 ) state_next = {bits}'d{(s + 1) % states};",
+            f"        else if ( in == 2'd1 ) state_next = {bits}'d{(s * 3 + 1) % states};",
+            f"        else state_next = {bits}'d0;",
+            "      end",
+        ]
+    lines += [
+        f"      default: state_next = {bits}'bx;",
+        "    endcase",
+        "  end",
+        "",
+        "  always_comb begin",
+        "    case ( state )",
+    ]
+    for s in range(states):
+        lines.append(f"      {bits}'d{s}: out = 8'd{s % 256};")
+    lines += [
+        "      default: out = 8'bx;",
+        "    endcase",
+        "  end",
+        "",
+        "endmodule",
+        "",
+        "`endif",
+    ]
+    design = f"{name}.v"
+    files = {design: "\n".join(lines) + "\n", f"{name}-test.v": _test_bench(design)}
+    return files, f"{name}-test.v", {name: "RTL"}
+
+def generate_regfile(registers: int, width: int = 32):
+    """A RegfileFlat1r1w_4x4b_RTL style register file with one case item per register."""
+    name = f"RegfileFlat1r1w_{registers}x{width}b_RTL"
+    bits = max(1, (registers - 1).bit_length())
+    lines = [
+        f"`ifndef {name.upper()}",
+        f"`define {name.upper()}",
+        "",
+        f"module {name}",
+        "(",
+        "  (* keep=1 *) input  logic       clk,",
+        "",
+        "  (* keep=1 *) input  logic       wen,",
+        f"  (* keep=1 *) input  logic [{bits - 1}:0] waddr,",
+        f"  (* keep=1 *) input  logic [{width - 1}:0] wdata,",
+        "",
+        f"  (* keep=1 *) input  logic [{bits - 1}:0] raddr,",
+        f"  (* keep=1 *) output logic [{width - 1}:0] rdata",
+        ");",
+        "",
+        f"  logic [{width - 1}:0] regfile [0:{registers - 1}];",
+        "",
+        "  always_ff @( posedge clk ) begin",
+        "    if ( wen )",
+        "      case (waddr)",
+    ]
+    for r in range(registers):
+        lines.append(f"      {bits}'d{r}: regfile[{r}] <= wdata;")
+    lines += [
+        f"      default: regfile[0] <= {width}'bx;",
+        "      endcase",
+        "  end",
+        "",
+        "  always_comb begin",
+        "    case (raddr)",
+    ]
+    for r in range(registers):
+        lines.append(f"    {bits}'d{r}: rdata = regfile[{r}];")
+    lines += [
+        f"    default: rdata = {width}'bx;",
+        "    endcase",
+        "  end",
+        "",
+        "endmodule",
+        "",
+        "`endif",
+    ]
+    design = f"{name}.v"
+    files = {design: "\n".join(lines) + "\n", f"{name}-test.v": _test_bench(design)}
+    return files, f"{name}-test.v", {name: "RTL"}
+
+def generate_netlist(gates: int):
+    """A gate level netlist: a chain of two input primitive gates over the inputs."""
+    name = f"Netlist_{gates}g_GL"
+    inputs = 16
+    kinds = ["and", "or", "xor", "nand", "nor", "xnor"]
+    lines = [
+        f"`ifndef {name.upper()}",
+        f"`define {name.upper()}",
+        "",
+        f"module {name}",
+        "(",
+        f"  (* keep=1 *) input  wire [{inputs - 1}:0] in_,",
+        "  (* keep=1 *) output wire        out",
+        ");",
+        "",
+        f"  wire [{gates - 1}:0] w;",
+        "",
+    ]
+    for g in range(gates):
+        a = f"in_[{g % inputs}]" if g < 2 else f"w[{g - 1}]"
+        b = f"in_[{(g * 7 + 3) % inputs}]" if g < 2 else f"w[{g - 2}]"
+        lines.append(f"  {kinds[g % len(kinds)]}( w[{g}], {a}, {b} );")
+    lines += [
+        "",
+        f"  assign out = w[{gates - 1}];",
+        "",
+        "endmodule",
+        "",
+        "`endif",
+    ]
+    design = f"{name}.v"
+    files = {design: "\n".join(lines) + "\n", f"{name}-test.v": _test_bench(design)}
+    return files, f"{name}-test.v", {name: "GL"}
+
+def generate_includes(depth: int):
+    """A chain of files, each include guarded and including the next, with one module each."""
+    files = {}
+    modules = {}
+    for d in range(depth):
+        name = f"Chain{d}_RTL"
+        lines = [
+            f"`ifndef {name.upper()}",
+            f"`define {name.upper()}",
+            "",
+        ]
+        if d + 1 < depth:
+            lines.append(f"`include \"Chain{d + 1}_RTL.v\"")
+        lines += [
+            "",
+            f"module {name}",
+            "(",
+            "  (* keep=1 *) input  logic [3:0] in_,",
+            "  (* keep=1 *) output logic [3:0] out",
+            ");",
+            "",
+            "  always_comb begin",
+            "    out = 4'b0;",
+            "    case ( in_[1:0] )",
+            "      2'd0: out = in_;",
+            "      2'd1: out = ~in_;",
+            "      default: out = 4'bx;",
+            "    endcase",
+            "  end",
+            "",
+            "endmodule",
+            "",
+            "`endif",
+        ]
+        files[f"{name}.v"] = "\n".join(lines) + "\n"
+        modules[name] = "RTL"
+    files["Chain-test.v"] = _test_bench("Chain0_RTL.v")
+    return files, "Chain-test.v", modules
+
+GENERATORS: Dict[str, Callable] = {
+    "fsm": generate_fsm,
+    "regfile": generate_regfile,
+    "netlist": generate_netlist,
+    "includes": generate_includes,
+}
+
+#--------------------
+# Running
+#--------------------
+
+def benchmark_config(modules: Dict[str, str]) -> Dict[str, List[str]]:
+    """Resolves the rule sets of rulesets.yaml for the generated modules."""
+    import yaml
+    with open(Path(__file__).resolve().parent / "rulesets.yaml") as f:
+        rule_sets = yaml.safe_load(f).get("rule-sets", {})
+    config, _ = resolve_rule_sets({"rule-sets": rule_sets, "modules": modules})
+    return config
+
+def run_once(directory: Path, top: str, config) -> Tuple[float, dict, int, int]:
+    """
+    Preprocesses and lints one generated design from scratch (nothing is reused
+    from earlier runs except the parser itself).
+
+    Returns: (seconds, stage name to seconds, lines processed, violations found)
+    """
+    from lint.linter import lint_files, print_report
+
+    preprocessor.preprocess_code.cache_clear()
+    preprocessor.scan_source.cache_clear()
+    TIMINGS.reset()
+    TIMINGS.enabled = True
+    TIMINGS.begin_file(top)
+    sources = {}
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()):
+            paths, xprop_comb, xprop_seq = preprocessor.main(
+                [str(directory / top), "-I", str(directory), "-t"],
+                graph=preprocessor.IncludeGraph(), sources=sources)
+            report = lint_files(paths, config, xprop_comb, xprop_seq, sources=sources, use_cache=False)
+            with TIMINGS.stage("report"):
+                print_report(report)
+    finally:
+        TIMINGS.enabled = False
+    elapsed = time.perf_counter() - started
+
+    for f_path, error in report.errors:
+        raise RuntimeError(f"Benchmark design {f_path} could not be linted: {error}")
+    lines = sum(text.count("\n") for text in sources.values())
+    record = TIMINGS.take_file(top) or {"stages": {}}
+    return elapsed, record["stages"], lines, report.total
+
+def run_case(case: str, size: int, repeat: int) -> dict:
+    """
+    Generates one design and times it `repeat` times, keeping the fastest run.
+
+    Returns: The results of the case (times in seconds)
+    """
+    files, top, modules = GENERATORS[case](size)
+    config = benchmark_config(modules)
+    with tempfile.TemporaryDirectory(prefix="ece2300-lint-bench.") as temp_dir:
+        directory = Path(temp_dir)
+        for name, text in files.items():
+            (directory / name).write_text(text, encoding="utf-8")
+
+        best = None
+        for _ in range(repeat):
+            result = run_once(directory, top, config)
+            if best is None or result[0] < best[0]:
+                best = result
+
+    seconds, stages, lines, violations = best
+    module_count = sum(len(MODULE_PATTERN.findall(text)) for name, text in files.items() if name != top)
+    return {
+        "size": size,
+        "seconds": seconds,
+        "stages": stages,
+        "lines": lines,
+        "modules": module_count,
+        "lines_per_sec": lines / seconds if seconds else 0.0,
+        "modules_per_sec": module_count / seconds if seconds else 0.0,
+        "violations": violations,
+    }
+
+def warm_up() -> None:
+    """Builds the parser (or loads its cached tables) so the first case does not pay for it."""
+    from lint.linter import get_verilog_parser
+    get_verilog_parser()
+
+#--------------------
+# Reporting
+#--------------------
+
+def print_results(results: Dict[str, dict]) -> None:
+    """Prints one line per case and the stage breakdown of each."""
+    print(f"{'case':<10} {'size':>6} {'lines':>7} {'ms':>9} {'lines/s':>10} {'modules/s':>10} {'violations':>10}")
+    for case, r in results.items():
+        print(f"{case:<10} {r['size']:>6} {r['lines']:>7} {r['seconds'] * 1000:>9.1f} "
+              f"{r['lines_per_sec']:>10.0f} {r['modules_per_sec']:>10.1f} {r['violations']:>10}")
+    for case, r in results.items():
+        stages = ", ".join(f"{stage} {seconds * 1000:.1f}"
+                           for stage, seconds in sorted(r["stages"].items(), key=lambda s: s[1], reverse=True))
+        print(f"  {case} stages (ms): {stages}")
+
+def compare_to_baseline(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> bool:
+    """
+    Compares every case with the same case (and size) in the baseline.
+
+    Returns: True if nothing got slower than tolerance allows and every case reports
+             the same number of violations as before
+    """
+    ok = True
+    print(f"\nCompared to baseline (tolerance {tolerance:.2f}x):")
+    for case, r in results.items():
+        base = baseline.get(case)
+        if base is None or base.get("size") != r["size"]:
+            print(f"  {case:<10} no baseline for this size")
+            continue
+        ratio = r["seconds"] / base["seconds"] if base["seconds"] else float("inf")
+        status = "ok"
+        if ratio > tolerance:
+            status = "REGRESSION"
+            ok = False
+        if r["violations"] != base.get("violations"):
+            status = f"CHANGED OUTPUT ({base.get('violations')} -> {r['violations']} violations)"
+            ok = False
+        print(f"  {case:<10} {base['seconds'] * 1000:9.1f} ms -> {r['seconds'] * 1000:9.1f} ms  "
+              f"({ratio:.2f}x)  {status}")
+    return ok
+
+#--------------------
+# Command line
+#--------------------
+
+def main(args_list=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the ECE2300 linter on synthetic designs.")
+    parser.add_argument("--cases", default=",".join(GENERATORS),
+                        help=f"Comma separated cases to run (default: {','.join(GENERATORS)}).")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Multiply the size of every design by this factor (default: 1).")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Times to run each case, the fastest run is reported (default: 3).")
+    parser.add_argument("--baseline", metavar="FILE", default=None,
+                        help="Compare against a baseline saved earlier and fail on regressions.")
+    parser.add_argument("--save-baseline", metavar="FILE", default=None,
+                        help="Save the results as a baseline.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Slowdown factor over the baseline that counts as a regression (default: {DEFAULT_TOLERANCE}).")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    args = parser.parse_args(args_list)
+
+    cases = [case.strip() for case in args.cases.split(",") if case.strip()]
+    unknown = [case for case in cases if case not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    warm_up()
+    results = {}
+    for case in cases:
+        size = max(1, int(DEFAULT_SIZES[case] * args.scale))
+        results[case] = run_case(case, size, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=1))
+    else:
+        print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare_to_baseline(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+ECE2300 Lint Cache
+A small on-disk cache used to skip work that was already done in a previous
+run, e.g. parsing a module whose cleaned source has not changed since the last
+`make check`.
+
+Entries are pickled objects stored under a content hash. The cache is bounded
+in size; when it grows past the limit the least recently used entries are
+deleted (every hit refreshes an entry's modification time). The size is only
+checked every so often, so the cache may briefly exceed the limit by a little.
+"""
+
+import hashlib
+import os
+import pickle
+import random
+import sys
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+# Environment variables to relocate or disable the cache
+CACHE_DIR_ENV_VAR = "ECE2300_LINT_CACHE_DIR"
+NO_CACHE_ENV_VAR = "ECE2300_LINT_NO_CACHE"
+
+# Default size limit for each cache directory
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+# Default number of objects kept by a MemoryCache
+DEFAULT_MAX_ENTRIES = 256
+
+# A cache directory is checked for eviction about this many times while a
+# max_bytes worth of entries is written to it
+EVICTION_CHECKS_PER_LIMIT = 16
+
+# Key: cache directory, Value: bytes this process may still write to it before the next eviction check
+_bytes_until_eviction = {}
+
+def default_cache_dir() -> Path:
+    """
+    Returns the directory all lint caches live in.
+    Uses $ECE2300_LINT_CACHE_DIR if set, otherwise $XDG_CACHE_HOME/ece2300-lint
+    (falling back to ~/.cache/ece2300-lint).
+    """
+    if os.environ.get(CACHE_DIR_ENV_VAR):
+        return Path(os.environ[CACHE_DIR_ENV_VAR])
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(xdg_cache_home) / "ece2300-lint"
+
+def cache_enabled() -> bool:
+    """Caching can be turned off for a whole build with $ECE2300_LINT_NO_CACHE."""
+    return not os.environ.get(NO_CACHE_ENV_VAR)
+
+def content_key(*parts) -> str:
+    """
+    Hashes any number of strings/bytes into a cache key.
+    Each part is length prefixed so ("ab", "c") and ("a", "bc") give different keys.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(str(len(part)).encode("ascii") + b":")
+        digest.update(part)
+    return digest.hexdigest()
+
+def code_fingerprint() -> str:
+    """
+    Hashes the code that decides what the linter reports: the lint scripts
+    themselves, the ece2300-lint driver next to them and the installed pyverilog.
+    """
+    lint_dir = Path(__file__).resolve().parent
+    parts = []
+    for path in sorted(lint_dir.glob("*.py")) + [lint_dir.parent / "ece2300-lint"]:
+        try:
+            parts.append(path.read_bytes())
+        except OSError:
+            parts.append(b"")
+
+    # Stat rather than import pyverilog, a cache hit should not need it at all
+    import importlib.util
+    spec = importlib.util.find_spec("pyverilog")
+    if spec is not None and spec.origin:
+        try:
+            stat = os.stat(spec.origin)
+            parts.append(f"{spec.origin}:{stat.st_mtime_ns}:{stat.st_size}")
+        except OSError:
+            pass
+    return content_key(*parts)
+
+def tool_fingerprint(config_path: Path) -> str:
+    """
+    Hashes everything besides the design sources that decides what the linter
+    reports: the code (see code_fingerprint) and the ruleset config. Cached
+    results are only reused while this fingerprint matches.
+    """
+    try:
+        config = Path(config_path).read_bytes()
+    except OSError:
+        config = b""
+    return content_key(code_fingerprint(), config)
+
+class DiskCache:
+    """
+    Size bounded, least recently used cache of pickled objects in one directory.
+    Any error reading or writing the cache is treated as a miss, so a broken or
+    read-only cache only costs performance.
+    """
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def _entry_path(self, key: str) -> Path:
+        return self.directory / f"{key}.pickle"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached object for key, or None on a miss."""
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            # Mark the entry as recently used
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Corrupt or incompatible entry (e.g. written by another pyverilog version)
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores value under key, then evicts old entries if the cache is too big."""
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError, TypeError) as e:
+            print(f"Info: Could not cache entry: {e}", file=sys.stderr)
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename it so readers never see partial entries
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, self._entry_path(key))
+        except OSError:
+            return
+
+        if self._eviction_due(len(data)):
+            self._evict()
+
+    def _eviction_due(self, written: int) -> bool:
+        """
+        Counts bytes written to the directory, returning True about every
+        max_bytes / EVICTION_CHECKS_PER_LIMIT bytes, so not every write scans the
+        whole directory (which is slow on network file systems). Each process
+        starts at a random point of the interval, so many short runs (one per
+        test bench) still check now and then.
+        """
+        interval = max(1, self.max_bytes // EVICTION_CHECKS_PER_LIMIT)
+        remaining = _bytes_until_eviction.get(self.directory)
+        if remaining is None:
+            remaining = random.randint(1, interval)
+        remaining -= written
+        if remaining > 0:
+            _bytes_until_eviction[self.directory] = remaining
+            return False
+        _bytes_until_eviction[self.directory] = interval
+        return True
+
+    def _evict(self) -> None:
+        """Deletes the least recently used entries until the cache fits in max_bytes."""
+        try:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".pickle"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                        total += stat.st_size
+        except OSError:
+            return
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+class MemoryCache:
+    """
+    Least recently used cache of objects kept in this process, optionally in front
+    of a DiskCache. Long running processes (the lint server, watch mode) get an
+    unchanged entry back without unpickling it again. Cached objects are shared,
+    so they must not be modified by whoever gets them.
+    """
+    def __init__(self, backing: Optional[DiskCache] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.backing = backing
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached object for key, or None on a miss."""
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            return value
+        if self.backing is None:
+            return None
+        value = self.backing.get(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores value under key, in memory and in the backing cache."""
+        self._remember(key, value)
+        if self.backing is not None:
+            self.backing.put(key, value)
+
+    def _remember(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
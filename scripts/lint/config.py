@@ -0,0 +1,273 @@
+"""
+ECE2300 Lint Config
+Resolves the rule sets in rulesets.yaml into the rules enabled for each module.
+
+Resolving the YAML is done once per change to the file: the result is written
+as a small JSON file next to the YAML (rulesets.yaml -> rulesets.compiled.json)
+and every later run just loads that. Problems in the YAML, such as names that
+are neither a rule set nor a rule or rule sets that include themselves, are
+found when it is compiled and stored with the result, so every run reports them.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from lint.cache import content_key, default_cache_dir
+from lint.lint_rules import Rules
+
+# Bump when the layout of the compiled file changes
+COMPILED_CONFIG_VERSION = 2
+
+#--------------------
+# Resolving
+#--------------------
+
+def known_rule_names() -> List[str]:
+    """Returns: The names of every rule defined in lint_rules.py"""
+    return sorted(obj.name for obj in Rules.__dict__.values()
+                  if isinstance(obj, type) and obj.__module__ == Rules.__module__)
+
+def resolve_rule_sets(user_config) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Expands the rule sets of an already parsed config into the rules of each module.
+
+    user_config: The parsed YAML dictionary with 'rule-sets' and 'modules'
+
+    Returns: (dictionary of module name to its sorted rule names, list of warnings)
+    Raises: ValueError if the config does not have the expected structure
+    """
+    if not isinstance(user_config, dict):
+        raise ValueError("Config file must be a YAML dictionary.")
+
+    rule_sets = user_config.get('rule-sets', {})
+    modules = user_config.get('modules', {})
+
+    if not isinstance(rule_sets, dict) or not isinstance(modules, dict):
+        raise ValueError("'rule-sets' and 'modules' must be dictionaries.")
+
+    rule_names = set(known_rule_names())
+    warnings = []
+    # Names that were already warned about, so each problem is reported once
+    reported = set()
+
+    def check_rule(item, owner):
+        if item not in rule_names and (item, owner) not in reported:
+            reported.add((item, owner))
+            warnings.append(f"Warning: '{item}' in {owner} is neither a rule set nor a known rule.")
+
+    def resolve_rule_set(name, path=()):
+        if name in path:
+            cycle = " -> ".join(path[path.index(name):] + (name,))
+            if ('cycle', cycle) not in reported:
+                reported.add(('cycle', cycle))
+                warnings.append(f"Warning: Rule set cycle {cycle}, the repeated set is ignored.")
+            return set()
+
+        result = set()
+        rules = rule_sets.get(name, [])
+        if not isinstance(rules, list):
+            if ('list', name) not in reported:
+                reported.add(('list', name))
+                warnings.append(f"Warning: Rule set '{name}' is not a list. Skipping.")
+            return result
+
+        for item in rules:
+            if item in rule_sets:
+                result.update(resolve_rule_set(item, path + (name,)))
+            else:
+                check_rule(item, f"rule set '{name}'")
+                result.add(item)
+        return result
+
+    final_config = {}
+    for module, items in modules.items():
+        # If items is a string, convert to list
+        if isinstance(items, str):
+            items = [items]
+
+        if not isinstance(items, list):
+            warnings.append(f"Warning: Module '{module}' should map to a list or a single string. Skipping.")
+            continue
+
+        resolved_rules = set()
+        for item in items:
+            if item in rule_sets:
+                resolved_rules.update(resolve_rule_set(item))
+            else:
+                check_rule(item, f"module '{module}'")
+                resolved_rules.add(item)
+
+        final_config[module] = sorted(resolved_rules)
+
+    return final_config, warnings
+
+def print_warnings(warnings: List[str]) -> None:
+    """Prints the warnings found while resolving a config to stderr."""
+    for warning in warnings:
+        print(warning, file=sys.stderr)
+
+def _read_and_resolve(config_filepath) -> Tuple[Dict[str, List[str]], List[str], bool]:
+    """
+    Reads and resolves a YAML config, printing errors to stderr. Warnings are
+    returned instead, for the caller to print.
+
+    Returns: (resolved config, warnings, True if the file was read and resolved without errors)
+    """
+    import yaml
+
+    try:
+        with open(config_filepath, 'r') as f:
+            user_config = yaml.safe_load(f)
+        final_config, warnings = resolve_rule_sets(user_config)
+    except yaml.YAMLError as e:
+        print(f"Error parsing YAML config file '{config_filepath}': {e}.", file=sys.stderr)
+        return {}, [], False
+    except Exception as e:
+        print(f"Unexpected error loading config file '{config_filepath}': {e}.", file=sys.stderr)
+        return {}, [], False
+
+    return final_config, warnings, True
+
+def load_lint_config(config_filepath='lint/lint_config.yaml'):
+    """
+    Load and resolve lint rules from a YAML file with support for recursive rule-set expansion.
+
+    Structure:
+    rule-sets:
+      base:
+        - rule1
+        - rule2
+      extended:
+        - base
+        - rule3
+
+    modules:
+      mod1:
+        - extended
+        - ruleX
+      mod2: extended
+
+    Output:
+    {
+      'mod1': ['rule1', 'rule2', 'rule3', 'ruleX']
+    }
+    """
+    if not os.path.exists(config_filepath):
+        print(os.getcwd())
+        print(f"Info: Config file '{config_filepath}' not found.", file=sys.stderr)
+        return {}
+
+    final_config, warnings, _ = _read_and_resolve(config_filepath)
+    print_warnings(warnings)
+    return final_config
+
+#--------------------
+# Compiled config
+#--------------------
+
+def compiled_config_paths(config_filepath) -> List[Path]:
+    """
+    Returns: The places the compiled form of a config may be stored, in order of preference.
+             Next to the YAML file, or in the cache directory if that is not writable.
+    """
+    config_path = Path(config_filepath).resolve()
+    return [
+        config_path.with_suffix(".compiled.json"),
+        default_cache_dir() / "config" / f"{content_key(str(config_path))}.json",
+    ]
+
+def _read_compiled(path: Path) -> Optional[dict]:
+    """Returns: The compiled config stored at path, or None if it is missing or unusable."""
+    try:
+        with open(path, 'r') as f:
+            compiled = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(compiled, dict) or compiled.get("version") != COMPILED_CONFIG_VERSION:
+        return None
+    # Validation depends on the rules that exist, so adding a rule recompiles
+    if compiled.get("rules") != known_rule_names() or not isinstance(compiled.get("modules"), dict):
+        return None
+    if not isinstance(compiled.get("warnings"), list):
+        return None
+    return compiled
+
+def _write_compiled(paths: List[Path], compiled: dict) -> None:
+    """Writes the compiled config to the first of paths that is writable."""
+    data = json.dumps(compiled, indent=1, sort_keys=True)
+    for path in paths:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename it so readers never see partial files
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            return
+        except OSError:
+            continue
+
+def compile_config(config_filepath) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Resolves a config like load_lint_config, but reuses the compiled form of the config
+    while the YAML file is unchanged. The compiled file records the YAML file's modification
+    time, size and hash: a matching time and size is trusted without reading the YAML,
+    otherwise the hash decides (e.g. after a checkout that only touched the file).
+    The warnings found when compiling are stored with it, so they are never lost.
+
+    Returns: (resolved config, warnings for the caller to print on every load)
+    """
+    try:
+        stat = os.stat(config_filepath)
+    except OSError:
+        return load_lint_config(config_filepath), []
+    stamp = [stat.st_mtime_ns, stat.st_size]
+
+    paths = compiled_config_paths(config_filepath)
+    candidates = []
+    for path in paths:
+        compiled = _read_compiled(path)
+        if compiled is None:
+            continue
+        if compiled.get("stamp") == stamp:
+            return compiled["modules"], compiled["warnings"]
+        candidates.append(compiled)
+
+    try:
+        with open(config_filepath, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return load_lint_config(config_filepath), []
+
+    unchanged = [compiled for compiled in candidates if compiled.get("sha256") == digest]
+    if unchanged:
+        modules, warnings = unchanged[0]["modules"], unchanged[0]["warnings"]
+    else:
+        modules, warnings, ok = _read_and_resolve(config_filepath)
+        # Broken configs are not stored so the error is reported again next time
+        if not ok:
+            return modules, warnings
+
+    _write_compiled(paths, {
+        "version": COMPILED_CONFIG_VERSION,
+        "stamp": stamp,
+        "sha256": digest,
+        "rules": known_rule_names(),
+        "modules": modules,
+        "warnings": warnings,
+    })
+    return modules, warnings
+
+def load_compiled_config(config_filepath):
+    """
+    Same as load_lint_config, but through the compiled config (see compile_config).
+    The warnings of the config are printed every time, not only when it is compiled.
+    """
+    modules, warnings = compile_config(config_filepath)
+    print_warnings(warnings)
+    return modules
@@ -1,109 +1,464 @@
 import sys
 import os
 import argparse
-import yaml
 import re
 import pathlib
 import json
+import tempfile
+import subprocess
+import time
 from typing import List, Optional
-from lint.lint_rules import Rules
+from lint.lint_rules import ALWAYS_NODES, Rules
+from lint.cache import DiskCache, MemoryCache, cache_enabled, content_key, default_cache_dir
+from lint.config import compile_config, load_lint_config, print_warnings
+from lint.report import Report, Violation, finish, print_report, print_violations, replay_results
+from lint.timing import TIMINGS
+from lint.preprocessor import COMMENT_OR_STRING_PATTERN, extract_all_includes
+from lint.resolver import SESSION_RESOLVER
+from lint.netlist import STRUCTURAL_RULES, read_netlist_module
 import pyverilog
-from pyverilog.vparser.parser import parse
+from pyverilog.vparser.parser import VerilogParser
+from pyverilog.vparser.lexer import VerilogLexer
+from ply.yacc import yacc
+from pyverilog.vparser.preprocessor import VerilogPreprocessor
 from pyverilog.vparser.ast import *
 from pyverilog.dataflow.visit import NodeVisitor
 
 XPROP_MACRO_REGEX = re.compile(r"`ECE2300_XPROP\d*\s*\(\s*(\w+)")
 
-def load_lint_config(config_filepath='lint/lint_config.yaml'):
-    """
-    Load and resolve lint rules from a YAML file with support for recursive rule-set expansion.
+LINT_CONFIG = {} # Will be populated by load_lint_config in main
+
+# Resolved configs by path, reused while the file is unchanged (e.g. in the lint server)
+# Key: config path, Value: ((mtime, size), resolved config, warnings)
+_CONFIG_CACHE = {}
 
-    Structure:
-    rule-sets:
-      base:
-        - rule1
-        - rule2
-      extended:
-        - base
-        - rule3
+def load_lint_config_cached(config_filepath):
+    """
+    Same as load_lint_config, but only re-reads the YAML file when it changes,
+    through the compiled config kept next to it (see lint/config.py). Its warnings
+    are printed on every call, so every run that uses the config reports them.
+    Returns a copy so callers can apply overrides without touching the cache.
+    """
+    try:
+        stat = os.stat(config_filepath)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return load_lint_config(config_filepath)
+
+    cached = _CONFIG_CACHE.get(config_filepath)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, *compile_config(config_filepath))
+        _CONFIG_CACHE[config_filepath] = cached
+    print_warnings(cached[2])
+    return dict(cached[1])
+
+def compile_rule_sets(config):
+    """
+    Compiles a resolved config into the form the linter checks against, so the
+    rule lookups done for every candidate violation are set lookups instead of
+    scans of a sorted list.
 
-    modules:
-      mod1:
-        - extended
-        - ruleX
-      mod2: extended
+    config: Dictionary of module name to the list of rule names enabled for it (see load_lint_config)
 
-    Output:
-    {
-      'mod1': ['rule1', 'rule2', 'rule3', 'ruleX']
-    }
+    Returns: Dictionary of module name to a frozenset of the rule names enabled for it
     """
-    final_config = {}
+    return {module: frozenset(rules) for module, rules in config.items()}
 
-    if not os.path.exists(config_filepath):
-        print(os.getcwd())
-        print(f"Info: Config file '{config_filepath}' not found.", file=sys.stderr)
-        return final_config
+# Building the PLY tables is the most expensive part of creating a parser,
+# so a single parser is created per process and reused for every file
+_VERILOG_PARSER = None
 
+class CachedTablesVerilogParser(VerilogParser):
+    """
+    A VerilogParser whose LALR tables are loaded from a pickle in the lint cache
+    instead of being generated. PLY only regenerates (and rewrites) the tables
+    if the pickle is missing or does not match the grammar.
+
+    tables_path: The pickle file to load the tables from or save them to
+    """
+    def __init__(self, tables_path):
+        self.lexer = VerilogLexer(error_func=self._lexer_error_func)
+        self.lexer.build()
+
+        self.tokens = self.lexer.tokens
+        self.parser = yacc(
+            module=self,
+            method="LALR",
+            picklefile=str(tables_path),
+            debug=False
+        )
+
+def parser_tables_path():
+    """
+    Returns the path of the pickled parser tables for the installed pyverilog.
+    The name includes the grammar file's version, size and modification time so a
+    different or edited pyverilog never reads tables built for another grammar.
+    """
+    import pyverilog.vparser.parser as vparser
     try:
-        with open(config_filepath, 'r') as f:
-            user_config = yaml.safe_load(f)
-
-        if not isinstance(user_config, dict):
-            raise ValueError("Config file must be a YAML dictionary.")
-
-        rule_sets = user_config.get('rule-sets', {})
-        modules = user_config.get('modules', {})
-
-        if not isinstance(rule_sets, dict) or not isinstance(modules, dict):
-            raise ValueError("'rule-sets' and 'modules' must be dictionaries.")
-
-        def resolve_rule_set(name, seen=None):
-            if seen is None:
-                seen = set()
-            if name in seen:
-                return []
-            seen.add(name)
-
-            result = set()
-            rules = rule_sets.get(name, [])
-            if not isinstance(rules, list):
-                print(f"Warning: Rule set '{name}' is not a list. Skipping.", file=sys.stderr)
-                return result
-
-            for item in rules:
-                if item in rule_sets:
-                    result.update(resolve_rule_set(item, seen))
-                else:
-                    result.add(item)
-            return result
+        stat = os.stat(vparser.__file__)
+        grammar_stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+    except OSError:
+        grammar_stamp = ""
+    key = content_key(pyverilog.__version__, vparser.__file__, grammar_stamp)
+    return pathlib.Path(parser_work_dir()) / f"parsetab-{key[:16]}.pickle"
+
+def build_verilog_parser(outputdir=None):
+    """
+    Creates a pyverilog parser, reusing the pickled tables from an earlier run.
+    New tables are written to a temporary file first and renamed into place, so
+    processes building the parser at the same time never read half a pickle.
+    Falls back to a plain VerilogParser (tables in outputdir) if that fails.
+    """
+    tables_path = parser_tables_path()
+    try:
+        if tables_path.exists():
+            try:
+                return CachedTablesVerilogParser(tables_path)
+            except Exception:
+                pass # Unreadable tables, build them again below
+        temp_path = tables_path.with_name(f"{tables_path.stem}.{os.getpid()}.tmp")
+        try:
+            verilog_parser = CachedTablesVerilogParser(temp_path)
+            if temp_path.exists():
+                os.replace(temp_path, tables_path)
+        finally:
+            if temp_path.exists():
+                os.remove(temp_path)
+        return verilog_parser
+    except Exception as e:
+        print(f"Info: Could not use cached parser tables: {e}", file=sys.stderr)
+        return VerilogParser(outputdir=outputdir or parser_work_dir())
+
+def get_verilog_parser(outputdir=None):
+    """
+    Returns the process wide pyverilog parser, creating it on first use.
+    outputdir is where PLY writes its tables if the cached tables cannot be used.
+    """
+    global _VERILOG_PARSER
+    if _VERILOG_PARSER is None:
+        _VERILOG_PARSER = build_verilog_parser(outputdir)
+    return _VERILOG_PARSER
+
+#--------------------
+# In-memory parsing
+#--------------------
+
+# Preprocessor directives that decide which `include lines are followed, outside
+# of comments and strings (those are matched first and skipped)
+DIRECTIVE_OR_SKIP_PATTERN = re.compile(
+    f"(?P<skip>{COMMENT_OR_STRING_PATTERN.pattern})"
+    r'|`include\s+"(?P<include>[^"]+)"'
+    r'|`(?P<cond>ifdef|ifndef|elsif)\s+(?P<cond_name>\w+)'
+    r'|`(?P<else>else)\b'
+    r'|`(?P<endif>endif)\b'
+    r'|`(?P<define>define|undef)\s+(?P<define_name>\w+)'
+)
+
+# Deepest include nesting followed before giving up
+MAX_INCLUDE_DEPTH = 64
+
+def flatten_includes(name, sources, defines=None, _stack=()):
+    """
+    Virtual include resolver: returns sources[name] with every `include of another
+    file in sources replaced by that file's (flattened) text, which is exactly what
+    the Verilog preprocessor reads when it follows the include on disk.
+
+    Only includes the preprocessor actually follows are replaced, so `define,
+    `undef and `ifdef/`ifndef/`elsif/`else/`endif are tracked (include guards).
+    Includes of files that are not in sources are left for the preprocessor.
+
+    sources: Dictionary of file name to cleaned file content
+    defines: Set of defined macro names, updated as the files are read
+
+    Raises: RecursionError for circular includes without include guards
+    """
+    # Files that include each other are fine as long as include guards stop the cycle
+    if len(_stack) >= MAX_INCLUDE_DEPTH:
+        raise RecursionError(f"Includes nested deeper than {MAX_INCLUDE_DEPTH} levels at '{name}' (circular include?)")
+    if defines is None:
+        defines = set()
+
+    # One entry per open `ifdef: (this branch is active, an earlier branch was taken, enclosing block is active)
+    conditions = []
+    active = True
+    pieces = []
+    last_end = 0
+    text = sources[name]
+    for match in DIRECTIVE_OR_SKIP_PATTERN.finditer(text):
+        if match.group('skip') is not None:
+            continue
+        if match.group('include') is not None:
+            if active and match.group('include') in sources:
+                pieces.append(text[last_end:match.start()])
+                pieces.append(flatten_includes(match.group('include'), sources, defines, _stack + (name,)))
+                last_end = match.end()
+        elif match.group('cond') is not None:
+            is_defined = match.group('cond_name') in defines
+            taken = is_defined if match.group('cond') != 'ifndef' else not is_defined
+            if match.group('cond') == 'elsif':
+                if conditions:
+                    _, any_taken, enclosing = conditions.pop()
+                    taken = taken and not any_taken
+                    conditions.append((taken, any_taken or taken, enclosing))
+            else:
+                conditions.append((taken, taken, active))
+        elif match.group('else') is not None:
+            if conditions:
+                _, any_taken, enclosing = conditions.pop()
+                conditions.append((not any_taken, True, enclosing))
+        elif match.group('endif') is not None:
+            if conditions:
+                conditions.pop()
+        elif active:
+            if match.group('define') == 'define':
+                defines.add(match.group('define_name'))
+            else:
+                defines.discard(match.group('define_name'))
+        active = conditions[-1][0] and conditions[-1][2] if conditions else True
+    pieces.append(text[last_end:])
+    return "".join(pieces)
 
-        for module, items in modules.items():
-            # If items is a string, convert to list
-            if isinstance(items, str):
-                items = [items]
+class PreprocessorError(Exception):
+    """Raised when the Verilog preprocessor fails, with its messages as the error."""
 
-            if not isinstance(items, list):
-                print(f"Warning: Module '{module}' should map to a list or a single string. Skipping.", file=sys.stderr)
+# Whether iverilog can read and write the pipes through /dev/stdin and /dev/stdout here
+PIPE_DEVICES = os.path.exists('/dev/stdin') and os.path.exists('/dev/stdout')
+
+def preprocess_text(text, preprocess_include=None, preprocess_define=None):
+    """
+    Runs the Verilog preprocessor (iverilog -E, like pyverilog) over text through
+    pipes instead of input and output files.
+
+    The messages of iverilog are printed to stderr when it succeeds. If it fails,
+    its partial output is dropped since it would only give misleading parse errors.
+
+    Returns: (preprocessed text, messages printed), results with messages must not be
+             cached since the messages would be lost on a cache hit
+    Raises: PreprocessorError with the messages of iverilog if it fails
+    Raises: OSError if iverilog cannot be run, like VerilogPreprocessor
+    """
+    if not PIPE_DEVICES:
+        # Some platforms have no /dev/stdin or /dev/stdout, go through a file there
+        fd, preprocess_output = tempfile.mkstemp(prefix='preprocess.', suffix='.output')
+        os.close(fd)
+        try:
+            preprocessor = VerilogPreprocessor([text], preprocess_output, preprocess_include, preprocess_define)
+            preprocessor.preprocess()
+            # iverilog prints its messages straight to stderr here
+            with open(preprocess_output) as f:
+                return f.read(), ""
+        finally:
+            os.remove(preprocess_output)
+
+    iverilog = os.environ.get('PYVERILOG_IVERILOG') or 'iverilog'
+    cmd = [iverilog]
+    for inc in preprocess_include or ():
+        cmd += ['-I', inc]
+    for dfn in preprocess_define or ():
+        cmd += ['-D', dfn]
+    cmd += ['-E', '-o', '/dev/stdout', '/dev/stdin']
+    proc = subprocess.run(cmd, input=text, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        raise PreprocessorError(proc.stderr.strip() or f"{iverilog} exited with status {proc.returncode}")
+    sys.stderr.write(proc.stderr)
+    return proc.stdout, proc.stderr
+
+def load_sources(path, include_dirs):
+    """
+    Reads a file and everything it includes from disk into a dictionary for
+    parse_modules, so files on disk are parsed (and cached) like cleaned files in
+    memory. Includes are looked up in include_dirs like the preprocessor does, the
+    ones that cannot be found or read are left for it to report.
+
+    Returns: Dictionary of file name (path for the file itself, include name for the rest) to content
+    Raises: OSError if path cannot be read
+    """
+    with open(path, encoding='utf-8') as f:
+        sources = {path: f.read()}
+    pending = [path]
+    while pending:
+        for include_name in extract_all_includes(sources[pending.pop()]):
+            if include_name in sources:
                 continue
+            found = SESSION_RESOLVER.find(include_name, include_dirs)
+            if found is None:
+                continue
+            try:
+                with open(found, encoding='utf-8') as f:
+                    sources[include_name] = f.read()
+            except (OSError, UnicodeDecodeError):
+                continue
+            pending.append(include_name)
+    return sources
 
-            resolved_rules = set()
-            for item in items:
-                if item in rule_sets:
-                    resolved_rules.update(resolve_rule_set(item))
-                else:
-                    resolved_rules.add(item)
+def parse_verilog_source(name, sources, preprocess_include=None, preprocess_define=None, cache=None):
+    """
+    Parses sources[name] without reading or writing any source files: includes are
+    resolved from sources in memory and the result is piped through the preprocessor.
 
-            final_config[module] = sorted(resolved_rules)
+    If a DiskCache is given, the result is looked up by the flattened text and
+    defines first and the file is only preprocessed and parsed on a miss.
 
-    except yaml.YAMLError as e:
-        print(f"Error parsing YAML config file '{config_filepath}': {e}.", file=sys.stderr)
-    except Exception as e:
-        print(f"Unexpected error loading config file '{config_filepath}': {e}.", file=sys.stderr)
+    Returns: (ast, directives)
+    """
+    defines = {define.split('=', 1)[0] for define in preprocess_define or []}
+    text = flatten_includes(name, sources, defines)
 
-    return final_config
+    key = None
+    if cache is not None:
+        key = content_key("pyverilog", pyverilog.__version__, "defines", *sorted(preprocess_define or []),
+                          "include", *(preprocess_include or []), "text", text)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
 
-LINT_CONFIG = {} # Will be populated by load_lint_config in main
+    text, messages = preprocess_text(text, preprocess_include, preprocess_define)
+    result = parse_text(text)
+
+    if cache is not None and not messages:
+        cache.put(key, result)
+    return result
+
+def parse_text(text):
+    """
+    Parses preprocessed Verilog text with the process wide parser.
+
+    Returns: (ast, directives)
+    """
+    verilog_parser = get_verilog_parser(parser_work_dir())
+    # The lexer keeps its state between files, so reset it before every parse
+    verilog_parser.lexer.reset_lineno()
+    verilog_parser.lexer.directives = []
+    ast = verilog_parser.parse(text)
+    return (ast, verilog_parser.get_directives())
+
+#--------------------
+# Module by module parsing
+#--------------------
+
+# module/endmodule keywords outside of comments and strings (those are matched first and skipped)
+MODULE_BOUNDARY_PATTERN = re.compile(
+    f"(?P<skip>{COMMENT_OR_STRING_PATTERN.pattern})"
+    r'|\b(?P<keyword>(?:macro)?module|endmodule)\b'
+)
+
+def split_modules(text):
+    """
+    Splits preprocessed text right after every endmodule, so each piece has one
+    module and whatever comes before it (`timescale, attributes, ...). Whatever
+    follows the last module goes with the last piece.
+
+    Returns: List of (line offset, piece), the line offset being the number of lines
+             in the text before the piece. The whole text is one piece if it has no
+             modules or they are not properly paired.
+    """
+    pieces = []
+    start = 0
+    in_module = False
+    for match in MODULE_BOUNDARY_PATTERN.finditer(text):
+        keyword = match.group('keyword')
+        if keyword is None:
+            continue
+        if (keyword == 'endmodule') != in_module:
+            return [(0, text)]
+        in_module = not in_module
+        if not in_module:
+            pieces.append((text.count('\n', 0, start), text[start:match.end()]))
+            start = match.end()
+    if in_module or not pieces:
+        return [(0, text)]
+    offset, piece = pieces[-1]
+    pieces[-1] = (offset, piece + text[start:])
+    return pieces
+
+def parse_modules(name, sources, preprocess_include=None, preprocess_define=None, cache=None, read=None):
+    """
+    Parses sources[name] like parse_verilog_source, but one module at a time: the
+    preprocessed text is split with split_modules and each module is parsed and
+    cached on its own, keyed by its text alone. Editing one module of a file that
+    defines several then parses only that module again, wherever it ends up in the
+    file, and a module included by many test benches is parsed once for all of them.
+
+    Line numbers in the ASTs count from the start of each piece, so they stay valid
+    when the lines above a module change. Add the line offset to get file lines.
+
+    If a cache is given, the modules the file is split into are also cached by the
+    flattened text and defines, so an unchanged file is not even preprocessed
+    (unless the preprocessor printed warnings, which have to be printed every time).
+
+    read: Called with the text of each module first, returns its AST built without
+          the parser (see read_netlist_module) or None to parse the module
+
+    Returns: List of (line offset, key, ast), key being None if the file could not
+             be parsed module by module and was parsed as a whole
+    """
+    defines = {define.split('=', 1)[0] for define in preprocess_define or []}
+    text = flatten_includes(name, sources, defines)
+
+    # Key: None, or the key of the list of (line offset, key, text) of each module
+    layout_key = None
+    layout = None
+    if cache is not None:
+        layout_key = content_key("pyverilog", pyverilog.__version__, "module texts", "defines", *sorted(preprocess_define or []),
+                                 "include", *(preprocess_include or []), "text", text)
+        layout = cache.get(layout_key)
+    if layout is None:
+        text, messages = preprocess_text(text, preprocess_include, preprocess_define)
+        layout = [(offset, content_key("pyverilog", pyverilog.__version__, "module", piece), piece)
+                  for offset, piece in split_modules(text)]
+        if cache is not None and not messages:
+            cache.put(layout_key, layout)
+
+    modules = []
+    for offset, key, piece in layout:
+        ast = read(piece) if read is not None else None
+        if ast is None and cache is not None:
+            ast = cache.get(key)
+        if ast is None:
+            try:
+                ast, _ = parse_text(piece)
+            except Exception:
+                if len(layout) == 1:
+                    raise
+                # Parse the whole file again so errors have the line numbers of the file
+                return [(0, None, parse_text("".join(piece for _, _, piece in layout))[0])]
+            if cache is not None:
+                cache.put(key, ast)
+        modules.append((offset, key, ast))
+    return modules
+
+# ASTs parsed (or loaded from disk) by this process, see session_ast_cache
+_SESSION_AST_CACHE: Optional[MemoryCache] = None
+
+def session_ast_cache() -> MemoryCache:
+    """
+    Returns the AST cache shared by every lint in this process: ASTs are kept in
+    memory in front of the on-disk cache (if caching is enabled), so a long running
+    process such as the lint server or watch mode never parses an unchanged module twice.
+    """
+    global _SESSION_AST_CACHE
+    directory = default_cache_dir() / "ast" if cache_enabled() else None
+    backing = _SESSION_AST_CACHE.backing if _SESSION_AST_CACHE is not None else None
+    if _SESSION_AST_CACHE is None or (backing.directory if backing is not None else None) != directory:
+        _SESSION_AST_CACHE = MemoryCache(DiskCache(directory) if directory is not None else None)
+    return _SESSION_AST_CACHE
+
+# Violations found by this process, see lint_modules (not kept on disk, since
+# they also depend on the linter code)
+_SESSION_VIOLATION_CACHE = MemoryCache()
+
+def parser_work_dir():
+    """
+    Returns the directory for the parser tables and the files PLY writes when it
+    builds them.
+    """
+    work_dir = default_cache_dir() / "parser"
+    try:
+        work_dir.mkdir(parents=True, exist_ok=True)
+        return str(work_dir)
+    except OSError:
+        return tempfile.gettempdir()
 
 def is_x_assignment(assignment_node):
     """
@@ -129,22 +484,295 @@ def is_x_assignment(assignment_node):
  
     return False
 
+class AssignmentIndex:
+    """
+    Answers every "what is assigned under this statement" question for one always
+    block, so the rules do not each walk the same statement subtrees again.
+    The LHS sets are built bottom up and stored per node (keyed by id() since
+    Pyverilog nodes compare by value), so nested ifs and cases are walked once.
+
+    lhs_info: Function returning the set of (signal_name, type_of_assignment, line_number)
+              assigned by a single substitution
+    """
+    def __init__(self, lhs_info):
+        self._lhs_info = lhs_info
+        # Key: id(node), Value: the node and its set of (signal_name, type_of_assignment, line_number)
+        self._lhs_sets = {}
+        # Key: id(node), Value: the node and a dict of signal name to its substitutions
+        self._assignments_by_signal = {}
+
+    def build(self, statement_node):
+        """
+        Indexes a whole always block statement in a single pass.
+
+        Returns: (blocking substitutions, nonblocking substitutions) anywhere in the statement,
+                 including inside loops, in source order
+        """
+        blocking, nonblocking = [], []
+        self._walk(statement_node, blocking, nonblocking)
+        return blocking, nonblocking
+
+    def _walk(self, statement_node, blocking, nonblocking):
+        """Returns the LHS set of statement_node, recording its substitutions on the way."""
+        if statement_node is None:
+            return set()
+        cached = self._lhs_sets.get(id(statement_node))
+        if cached is not None and blocking is None:
+            return cached[1]
+
+        collected = set()
+        if isinstance(statement_node, (NonblockingSubstitution, BlockingSubstitution)):
+            collected = self.lhs_info(statement_node)
+            if blocking is not None:
+                (blocking if isinstance(statement_node, BlockingSubstitution) else nonblocking).append(statement_node)
+        elif isinstance(statement_node, Block):
+            if statement_node.statements:
+                for stmt in statement_node.statements:
+                    collected |= self._walk(stmt, blocking, nonblocking)
+        elif isinstance(statement_node, IfStatement):
+            collected |= self._walk(statement_node.true_statement, blocking, nonblocking)
+            if statement_node.false_statement:
+                collected |= self._walk(statement_node.false_statement, blocking, nonblocking)
+        elif isinstance(statement_node, CaseStatement):
+            if statement_node.caselist:
+                for case_item in statement_node.caselist:
+                    collected |= self._walk(case_item.statement, blocking, nonblocking)
+        #Loops do not count as assigning anything, but their substitutions are still blocking/nonblocking
+        elif isinstance(statement_node, (ForStatement, WhileStatement, Repeat, ForeverStatement)):
+            if blocking is not None:
+                self._walk(statement_node.statement, blocking, nonblocking)
+
+        self._lhs_sets[id(statement_node)] = (statement_node, collected)
+        return collected
+
+    def lhs_info(self, statement_node):
+        """Returns the set of (signal_name, type_of_assignment, line_number) assigned by one substitution."""
+        cached = self._lhs_sets.get(id(statement_node))
+        if cached is None:
+            cached = (statement_node, self._lhs_info(statement_node))
+            self._lhs_sets[id(statement_node)] = cached
+        return cached[1]
+
+    def lhs(self, statement_node):
+        """
+        Returns all the signals assigned (both blocking and nonblocking) in a statement tree like ifs/cases
+        as a set of (signal_name, type_of_assignment, line_number). The set must not be modified.
+        """
+        return self._walk(statement_node, None, None)
+
+    def assignments_to(self, statement_node, signal_name):
+        """Returns the substitutions in a statement tree that assign signal_name, in source order."""
+        cached = self._assignments_by_signal.get(id(statement_node))
+        if cached is None:
+            by_signal = {}
+            self._collect_assignments(statement_node, by_signal)
+            cached = (statement_node, by_signal)
+            self._assignments_by_signal[id(statement_node)] = cached
+        return cached[1].get(signal_name, [])
+
+    def _collect_assignments(self, node, by_signal):
+        if isinstance(node, (BlockingSubstitution, NonblockingSubstitution)):
+            for name in {name for name, _, _ in self.lhs_info(node)}:
+                by_signal.setdefault(name, []).append(node)
+        elif isinstance(node, Block) and node.statements:
+            for stmt in node.statements:
+                self._collect_assignments(stmt, by_signal)
+        elif isinstance(node, IfStatement):
+            if node.true_statement:
+                self._collect_assignments(node.true_statement, by_signal)
+            if node.false_statement:
+                self._collect_assignments(node.false_statement, by_signal)
+        elif isinstance(node, CaseStatement) and node.caselist:
+            for case_item in node.caselist:
+                if case_item.statement:
+                    self._collect_assignments(case_item.statement, by_signal)
+
+# Declarations that give a signal its width (Logic only exists in Pyverilog builds with SystemVerilog support)
+SIGNAL_DECLARATIONS = tuple(cls for cls in (Input, Output, Inout, Wire, Reg, Tri, globals().get('Logic'))
+                            if cls is not None)
+
+def constant_value(node):
+    """
+    Evaluates a constant index or width expression made of integer literals, + - and *.
+
+    Returns: The value as an int
+    Returns: None if node is anything else (a parameter, a literal with x or z, ...)
+    """
+    if isinstance(node, IntConst):
+        m = re.match(r"(?:\d*)'[sS]?([bBoOdDhH])([0-9a-fA-F_]+)$|([0-9_]+)$", node.value)
+        if not m:
+            return None
+        if m.group(3) is not None:
+            return int(m.group(3).replace('_', ''))
+        base = {'b': 2, 'o': 8, 'd': 10, 'h': 16}[m.group(1).lower()]
+        try:
+            return int(m.group(2).replace('_', ''), base)
+        except ValueError:
+            return None
+    if isinstance(node, (Plus, Minus, Times)):
+        left, right = constant_value(node.left), constant_value(node.right)
+        if left is None or right is None:
+            return None
+        if isinstance(node, Plus):
+            return left + right
+        return left - right if isinstance(node, Minus) else left * right
+    return None
+
+def declared_ranges(module_node):
+    """
+    Collects the declared bit range of every signal of a module, from its port list and declarations.
+    Arrays, signals with non constant widths and signals declared twice with different widths are left out.
+
+    Returns: Dictionary of signal name to (msb, lsb), (0, 0) for single bit signals
+    """
+    ranges = {}
+    conflicting = set()
+
+    def add(decl):
+        if decl is None or not isinstance(decl, SIGNAL_DECLARATIONS):
+            return
+        if getattr(decl, 'dimensions', None) is not None:
+            conflicting.add(decl.name)
+            return
+        if decl.width is None:
+            bit_range = (0, 0)
+        else:
+            bit_range = (constant_value(decl.width.msb), constant_value(decl.width.lsb))
+            if None in bit_range:
+                conflicting.add(decl.name)
+                return
+        #'output logic [7:0] y' declares y twice, a bare 'output y' followed by 'logic [7:0] y' keeps the width
+        if decl.name in ranges and ranges[decl.name] != bit_range:
+            if decl.width is None:
+                return
+            if ranges[decl.name] != (0, 0):
+                conflicting.add(decl.name)
+        ranges[decl.name] = bit_range
+
+    if module_node.portlist and module_node.portlist.ports:
+        for port in module_node.portlist.ports:
+            if isinstance(port, Ioport):
+                add(port.first)
+                add(port.second)
+    for item in module_node.items or ():
+        if isinstance(item, Decl) and item.list:
+            for decl in item.list:
+                add(decl)
+    return {name: bit_range for name, bit_range in ranges.items() if name not in conflicting}
+
+class BitCoverage:
+    """
+    Tracks which bits of each signal have been assigned, one int per signal used as a bitset
+    (bit 0 of the mask is the lowest declared bit), so that e.g. x[3:0] followed by x[7:4]
+    is known to cover all of a logic [7:0] x.
+
+    ranges: Dictionary of signal name to declared (msb, lsb), see declared_ranges
+    """
+    def __init__(self, ranges):
+        self.ranges = ranges
+        # Key: signal name, Value: mask of the bits assigned so far
+        self.masks = {}
+
+    def bits(self, name, high=None, low=None):
+        """
+        Returns: The mask of bits high down to low of a signal (all of it if high is None),
+                 clipped to its declared range. 0 if the width of the signal is not known.
+        """
+        bit_range = self.ranges.get(name)
+        if bit_range is None:
+            return 0
+        bottom, top = min(bit_range), max(bit_range)
+        if high is None:
+            high, low = top, bottom
+        high, low = min(max(high, low), top), max(min(high, low), bottom)
+        if high < low:
+            return 0
+        return ((1 << (high - low + 1)) - 1) << (low - bottom)
+
+    def add(self, name, bits):
+        """
+        Marks bits of a signal as assigned.
+
+        Returns: True if every bit of the signal has now been assigned
+        """
+        if bits:
+            self.masks[name] = self.masks.get(name, 0) | bits
+        return self.is_complete(name)
+
+    def is_complete(self, name):
+        full = self.bits(name)
+        return full != 0 and self.masks.get(name, 0) & full == full
+
+#--------------------
+# Rule checks
+#--------------------
+
+# Events raised while the linter walks the AST, every check runs on one of them
+ON_ENTER = "enter"              # Any node, before its children are visited
+ON_MODULE_ITEM = "module_item"  # A direct item of a module definition, before ON_ENTER
+ON_FF_EXIT = "ff_exit"          # An always_ff block, after its statements were visited
+ON_SEQUENTIAL = "sequential"    # An always block that is not combinational, at the end
+ON_COMB_ENTER = "comb_enter"    # A combinational always block (always_comb, always @*), before its statements
+ON_COMB_EXIT = "comb_exit"      # A combinational always block, after its statements were visited
+
+# Statement nodes only checked inside always blocks
+ALWAYS_BODY_NODES = frozenset(["IfStatement", "CaseStatement"])
+
+def rule_check(*rules, on, event=ON_ENTER):
+    """
+    Marks a VerilogLinter method as a check. It is called with every node of the
+    given types when the event is raised for it, in modules that enable at least
+    one of rules. Every rule must list the node types in its `nodes`.
+
+    on: Name of an AST node type, or a tuple of names
+    event: One of the ON_ events
+    """
+    def decorate(method):
+        method.rule_check = (frozenset((on,) if isinstance(on, str) else on), event, frozenset(rule.name for rule in rules))
+        return method
+    return decorate
+
 class VerilogLinter(NodeVisitor):
     """
     A Pyverilog NodeVisitor subclass that performs linting checks on Verilog ASTs.
     It identifies violations based on the loaded configuration.
+
+    The AST is walked once. The visit_ methods only walk the tree and keep track
+    of where the walk is (module, always block, assignments of the block). The
+    rules are applied by the methods marked with rule_check, which are called
+    through a dispatch table built once per ruleset.
     """
-    def __init__(self, config):
+    #Every check, in the order they are defined: (node type names, event, rule names, method name)
+    #Filled in by _register_checks below the class
+    CHECKS = ()
+
+    #Rules checked by each check, for the --timings report
+    VISITOR_RULES = {}
+
+    #Rules checked inside always blocks, the body of a block is skipped when none of them are enabled
+    ALWAYS_BODY_RULES = frozenset()
+
+    #Dispatch tables shared by every linter
+    #Key: ruleset, Value: dictionary of (node class, event) to the checks to call
+    _DISPATCH_TABLES = {}
+
+    def __init__(self, config, filename=None):
         super(VerilogLinter, self).__init__()
         #Just check if the config has the rule, if so the rule is present
         self.config = config
+        #File being linted, recorded in every violation
+        self.filename = filename
         #Ruleset for the specific module
-        self.current_ruleset = []
-        #Stores Violations
-        self.violations = []
+        self.current_ruleset = frozenset()
+        #Stores Violations in the order they were found, keyed by Violation.key to drop duplicates
+        self._violations = {}
 
         #Tracks the module being processed
         self.current_module_name = None
+        self.current_module_node = None
+
+        #Checks to call for the current ruleset, see _checks
+        self._dispatch = self._DISPATCH_TABLES.setdefault(self.current_ruleset, {})
 
         #Tracks the state of always_comb blocks
         self._in_always_comb = False
@@ -155,6 +783,9 @@ class VerilogLinter(NodeVisitor):
         #Set of signals that are assigned at the top of always_comb
         self._always_comb_top_level_full_defaults = set()
 
+        #Declared bit ranges of the signals of the current module, see _get_declared_ranges
+        self._declared_ranges = None
+
         #Set of signals that already have violations to prevent duplicates
         self._rule1_signals_flagged_in_current_always = set()
 
@@ -167,6 +798,17 @@ class VerilogLinter(NodeVisitor):
 
         self._conditionally_assigned_signals_info = {}
 
+        #Index of the assignments in the always block being processed
+        self._assignment_index = None
+
+        #Statements and assignments of the always block being processed
+        self._always_statements = []
+        self._blocking_assignments = []
+        self._nonblocking_assignments = []
+
+        #Time spent in nested visitors, one entry per visitor in progress (only used with timings enabled)
+        self._nested_visit_time = []
+
     def _add_violation(self, rule_class, node, **kwargs, ):
         """
         Adds violation if found
@@ -177,40 +819,19 @@ class VerilogLinter(NodeVisitor):
         """
         if rule_class.name in self.current_ruleset:
             message = rule_class.error_message.format(**kwargs)
-            v = (self.current_module_name, rule_class.name, message, node.lineno)
-            if v not in self.violations:
-                self.violations.append(v)
+            v = Violation(self.current_module_name, rule_class.name, message, node.lineno,
+                          getattr(rule_class, 'ID', None), self.filename)
+            self._violations.setdefault(v.key, v)
 
-    def find_assignments_in_node(self, node, signal_name, found_assignments):
-        """
-        Finds all assignments associated with a given signal name in the AST node.
-        node: The AST node to search within.
+    def _any_enabled(self, rule_names):
+        """True if any of the given rules is enabled for the module being processed."""
+        return not self.current_ruleset.isdisjoint(rule_names)
+
+    @property
+    def violations(self):
+        """List of the Violations found so far, in the order they were found."""
+        return list(self._violations.values())
 
-        signal_name: The name of the signal to search for.
-        found_assignments: A list to append found assignment nodes.
-        """
-        #Basic substitution checks
-        if isinstance(node, (BlockingSubstitution, NonblockingSubstitution)):
-            assignments_info = self._get_assigned_lhs_info(node)
-            for name, _, _ in assignments_info:
-                if name == signal_name:
-                    found_assignments.append(node)
-        #Recursivley check children in block            
-        elif isinstance(node, Block) and node.statements:
-            for stmt in node.statements:
-                self.find_assignments_in_node(stmt, signal_name, found_assignments)
-        #Recursively check children in true and false statement        
-        elif isinstance(node, IfStatement):
-            if node.true_statement:
-                self.find_assignments_in_node(node.true_statement, signal_name, found_assignments)
-            if node.false_statement:
-                self.find_assignments_in_node(node.false_statement, signal_name, found_assignments)
-        #Check all branches of a Case statement        
-        elif isinstance(node, CaseStatement) and node.caselist:
-            for case_item in node.caselist:
-                if case_item.statement:
-                    self.find_assignments_in_node(case_item.statement, signal_name, found_assignments)
-    
     def _get_assigned_lhs_info(self, statement_node):
         """
         Extract info about the left hand side of an assignment
@@ -293,110 +914,56 @@ class VerilogLinter(NodeVisitor):
         
         return concat_signals
 
-    def _collect_all_lhs_in_statement_tree(self, statement_node, collected_lhs_info=None):
-            """
-            This function is for getting all the signal names assigned (both blocking and nonblocking) in a statement tree like ifs/cases
-
-            statement_node: The node to start from
-            collected_lhs_info: The set of signals already collected
-            """
-            if collected_lhs_info is None: collected_lhs_info = set()
-            if statement_node is None: return collected_lhs_info
-
-            #If there is a assignment, get the info using the normal method
-            if isinstance(statement_node, (NonblockingSubstitution, BlockingSubstitution)):
-                collected_lhs_info.update(self._get_assigned_lhs_info(statement_node))
-            #This is a begin - end construct 
-            elif isinstance(statement_node, Block):
-                if statement_node.statements:
-                    #Iterate through all statements in the block and collect using normal method (Assume they could be trees)
-                    for stmt in statement_node.statements: self._collect_all_lhs_in_statement_tree(stmt, collected_lhs_info)
-            #This is a If statement
-            elif isinstance(statement_node, IfStatement):
-                #Traverse the true statement first
-                self._collect_all_lhs_in_statement_tree(statement_node.true_statement, collected_lhs_info)
-                #If an else exists traverse that too
-                if statement_node.false_statement: self._collect_all_lhs_in_statement_tree(statement_node.false_statement, collected_lhs_info)
-            #this is for a case statement
-            elif isinstance(statement_node, CaseStatement):
-                #If there is a case statement, traverse all statemnets
-                if statement_node.caselist:
-                    for case_item in statement_node.caselist: self._collect_all_lhs_in_statement_tree(case_item.statement, collected_lhs_info)
-            return collected_lhs_info
-
-    def _find_blocking_assignments_in_statement(self, statement_node, blocking_assignments_found):
-        """
-        Recursively finds any blocking assignments within a statement tree.
-        statement_node: The AST node of the statement to check.
-
-        blocking_assignments_found: A list to append found BlockingSubstitution nodes.
-        """
-        if statement_node is None:
-            return
+    def _get_declared_ranges(self):
+        """Returns the declared bit ranges of the signals of the current module, found the first time they are needed."""
+        if self._declared_ranges is None:
+            self._declared_ranges = declared_ranges(self.current_module_node) if self.current_module_node else {}
+        return self._declared_ranges
 
-        if isinstance(statement_node, BlockingSubstitution):
-            blocking_assignments_found.append(statement_node)
-        
-        # Recursively check compound statements
-        elif isinstance(statement_node, Block):
-            if statement_node.statements:
-                for stmt in statement_node.statements:
-                    self._find_blocking_assignments_in_statement(stmt, blocking_assignments_found)
-        elif isinstance(statement_node, IfStatement):
-            self._find_blocking_assignments_in_statement(statement_node.true_statement, blocking_assignments_found)
-            if statement_node.false_statement:
-                self._find_blocking_assignments_in_statement(statement_node.false_statement, blocking_assignments_found)
-        elif isinstance(statement_node, (CaseStatement, CasexStatement, CasezStatement)): # Covers all case types
-            if statement_node.caselist:
-                for case_item in statement_node.caselist:
-                    self._find_blocking_assignments_in_statement(case_item.statement, blocking_assignments_found)
-        #We dont allow this using the restrictions on the constructs so theoretically should not reach here
-        elif isinstance(statement_node, ForStatement):
-            self._find_blocking_assignments_in_statement(statement_node.statement, blocking_assignments_found)
-        elif isinstance(statement_node, WhileStatement):
-            self._find_blocking_assignments_in_statement(statement_node.statement, blocking_assignments_found)
-        elif isinstance(statement_node, Repeat):
-            self._find_blocking_assignments_in_statement(statement_node.statement, blocking_assignments_found)
-        elif isinstance(statement_node, ForeverStatement):
-             self._find_blocking_assignments_in_statement(statement_node.statement, blocking_assignments_found)
-    
-    def _find_nonblocking_assignments_in_statement(self, statement_node, nonblocking_assignments_found):
+    def _get_assigned_bits(self, statement_node, coverage):
         """
-        Recursively finds any non-blocking assignments within a statement tree.
-        statement_node: The AST node of the statement to check.
+        Finds the bits the left hand side of an assignment covers, for the signals whose width is known.
+        Part selects and bit selects only count when their indices are integer literals.
+
+        statement_node: The assignment to check
+        coverage: The BitCoverage giving the declared ranges
 
-        nonblocking_assignments_found: A list to append found NonblockingSubstitution nodes.
+        Returns a dict of signal name to the mask of bits assigned
         """
-        if statement_node is None:
-            return
+        assigned_bits = {}
+
+        def collect(var):
+            if isinstance(var, Concat):
+                for item in var.list:
+                    collect(item)
+            elif isinstance(var, Identifier):
+                assigned_bits[var.name] = assigned_bits.get(var.name, 0) | coverage.bits(var.name)
+            elif isinstance(var, Partselect) and isinstance(var.var, Identifier):
+                #x[i+:4] is stored as a Partselect of expressions, only plain literals are trusted
+                if isinstance(var.msb, IntConst) and isinstance(var.lsb, IntConst):
+                    msb, lsb = constant_value(var.msb), constant_value(var.lsb)
+                    if msb is not None and lsb is not None:
+                        bits = coverage.bits(var.var.name, msb, lsb)
+                        assigned_bits[var.var.name] = assigned_bits.get(var.var.name, 0) | bits
+            elif isinstance(var, Pointer) and isinstance(var.var, Identifier) and isinstance(var.ptr, IntConst):
+                index = constant_value(var.ptr)
+                if index is not None:
+                    bits = coverage.bits(var.var.name, index, index)
+                    assigned_bits[var.var.name] = assigned_bits.get(var.var.name, 0) | bits
+
+        if isinstance(statement_node, (NonblockingSubstitution, BlockingSubstitution)) and isinstance(statement_node.left, Lvalue):
+            collect(statement_node.left.var)
+        return assigned_bits
+
+    def _get_assignment_index(self):
+        """
+        Returns the assignment index of the always block being processed.
+        Statements outside an always block (e.g. in a generate) get a fresh index.
+        """
+        if self._assignment_index is None:
+            return AssignmentIndex(self._get_assigned_lhs_info)
+        return self._assignment_index
 
-        if isinstance(statement_node, NonblockingSubstitution):
-            nonblocking_assignments_found.append(statement_node)
-        
-        # Recursively check compound statements
-        elif isinstance(statement_node, Block):
-            if statement_node.statements:
-                for stmt in statement_node.statements:
-                    self._find_nonblocking_assignments_in_statement(stmt, nonblocking_assignments_found)
-        elif isinstance(statement_node, IfStatement):
-            self._find_nonblocking_assignments_in_statement(statement_node.true_statement, nonblocking_assignments_found)
-            if statement_node.false_statement:
-                self._find_nonblocking_assignments_in_statement(statement_node.false_statement, nonblocking_assignments_found)
-        elif isinstance(statement_node, (CaseStatement, CasexStatement, CasezStatement)):
-            if statement_node.caselist:
-                for case_item in statement_node.caselist:
-                    self._find_nonblocking_assignments_in_statement(case_item.statement, nonblocking_assignments_found)
-        
-        #We dont allow this using the restrictions on the constructs so theoretically should not reach here
-        elif isinstance(statement_node, ForStatement):
-            self._find_nonblocking_assignments_in_statement(statement_node.statement, nonblocking_assignments_found)
-        elif isinstance(statement_node, WhileStatement): 
-            self._find_nonblocking_assignments_in_statement(statement_node.statement, nonblocking_assignments_found)
-        elif isinstance(statement_node, Repeat):
-             self._find_nonblocking_assignments_in_statement(statement_node.statement, nonblocking_assignments_found)
-        elif isinstance(statement_node, ForeverStatement):  
-             self._find_nonblocking_assignments_in_statement(statement_node.statement, nonblocking_assignments_found)
-    
     def _is_simple_netlist_target(self, target_node):
         """
         Checks if an LHS or RHS target is a simple Identifier or a Partselect of an Identifier.
@@ -425,6 +992,53 @@ class VerilogLinter(NodeVisitor):
         return False
 
 
+    def visit(self, node):
+        """
+        Runs the checks subscribed to the node, then dispatches to the visit_ method
+        for the node's type (as NodeVisitor does) to visit its children.
+        """
+        for check in self._checks(node, ON_ENTER):
+            self._call_visitor(check.__get__(self), node)
+        visitor = getattr(self, 'visit_' + node.__class__.__name__, self.generic_visit)
+        return self._call_visitor(visitor, node)
+
+    def _checks(self, node, event):
+        """
+        Returns the checks to call for a node and event in the current module.
+        The table is filled in on first use, so every node type is looked up once per ruleset.
+        """
+        key = (node.__class__, event)
+        checks = self._dispatch.get(key)
+        if checks is None:
+            type_name = node.__class__.__name__
+            checks = self._dispatch[key] = tuple(
+                getattr(VerilogLinter, name) for types, check_event, rules, name in self.CHECKS
+                if check_event == event and type_name in types and not self.current_ruleset.isdisjoint(rules))
+        return checks
+
+    def _run_checks(self, node, event):
+        """Calls every check subscribed to the node and event."""
+        for check in self._checks(node, event):
+            self._call_visitor(check.__get__(self), node)
+
+    def _call_visitor(self, visitor, node):
+        """
+        Calls a visitor. With timings enabled, the time spent in it (excluding the
+        visitors it calls in turn) is recorded under the visitor's name.
+        """
+        if not TIMINGS.enabled:
+            return visitor(node)
+        nested = self._nested_visit_time
+        nested.append(0.0)
+        started = time.perf_counter()
+        try:
+            return visitor(node)
+        finally:
+            elapsed = time.perf_counter() - started
+            TIMINGS.add_visitor(visitor.__name__, elapsed - nested.pop())
+            if nested:
+                nested[-1] += elapsed
+
     def generic_visit(self, node): 
         """
         Overrides the generic_visit method to handle different node types. Had to modify to be able traverse
@@ -473,10 +1087,8 @@ class VerilogLinter(NodeVisitor):
         node: The module definition node to visit.
         """
         #Set the rules, if they are defined in the config get them, else just no rules
-        if (node.name in self.config):
-            self.current_ruleset = self.config.get(node.name)
-        else:
-            self.current_ruleset = []
+        #(a no-op for configs already compiled by compile_rule_sets)
+        self.current_ruleset = frozenset(self.config.get(node.name, ()))
         
         if (node.name in self._xprop_macro_comb_out_signals_found_by_regex):
             self.current_module_xprop_comb = self._xprop_macro_comb_out_signals_found_by_regex.get(node.name)
@@ -489,28 +1101,45 @@ class VerilogLinter(NodeVisitor):
             self.current_module_xprop_seq = []
 
         self.current_module_name = node.name
+        self.current_module_node = node
+        self._declared_ranges = None
+        self._dispatch = self._DISPATCH_TABLES.setdefault(self.current_ruleset, {})
         #Reset signals 
         self._conditionally_assigned_signals_info = {}
 
         if node.items:
             for item in node.items:
-                #The follow are our gate level checks, however since there is no longer a gate level rule, I need to check these rules individully
-                if isinstance(item, (Always, Initial, Function, Task, GenerateStatement, SystemCall)):
-                    self._add_violation(Rules.NOSPBLK, node, type=type(item).__name__,  name=node.name)
+                self._run_checks(item, ON_MODULE_ITEM)
                 #Go deeper into tree and visit children
                 if isinstance(item, Always):
-                    self.visit_Always(item) 
-                elif not isinstance(item, Always):
+                    #Every kind of always block is visited as an always block
+                    self._run_checks(item, ON_ENTER)
+                    self._call_visitor(self.visit_Always, item)
+                else:
                     self.visit(item)
 
         self.current_module_name = None
+        self.current_module_node = None
+
+    @rule_check(Rules.NOSPBLK, on=Rules.NOSPBLK.nodes, event=ON_MODULE_ITEM)
+    def check_module_item(self, node):
+        """
+        Gate level modules may not contain always blocks, initial blocks, functions,
+        tasks, generate statements or system calls.
+
+        node: The module item
+        """
+        self._add_violation(Rules.NOSPBLK, self.current_module_node, type=type(node).__name__, name=self.current_module_name)
 
     def visit_Assign(self, node):
+        """Continuous assignments are checked as a whole (see check_assign), their children are not visited."""
+
+    @rule_check(Rules.BADLHS, Rules.BADRHS, Rules.COMPLEXLHS, Rules.COMPLEXRHS, on="Assign")
+    def check_assign(self, node):
         #Gate-level assign check:
         #Case 1: assign signal_or_partselect = literal
         #Case 2: assign signal_or_partselect = signal_or_partselect
         #No other operations allowed on RHS.
-
         lhs_node = None
         rhs_node = None
 
@@ -544,6 +1173,10 @@ class VerilogLinter(NodeVisitor):
                     self._add_violation(Rules.COMPLEXRHS, node, detail_msg=detail_msg)
     
     def visit_InstanceList(self, node):
+        """Instances are checked as a whole (see check_instance), their children are not visited."""
+
+    @rule_check(Rules.PRIMONLY, Rules.NOMODULE, Rules.COMPLEXRHS, on="InstanceList")
+    def check_instance(self, node):
         ALLOWED_GATES = {'and', 'or', 'not', 'xor', 'nand', 'nor', 'xnor'}
         DISALLOWED_GATES = {
             # Switch-level primitives
@@ -587,13 +1220,9 @@ class VerilogLinter(NodeVisitor):
 
         node: The always block node to visit.
         """
-        #Rule: Check for disallowed always_ff this should technically get caught by the preprocessor
-        if isinstance(node, AlwaysFF):
-            self._add_violation(Rules.ALWAYSFF, node)
-
-        #Rule: Check for generic 'always @(...)' when specific types are required
-        if  isinstance(node, Always) and not isinstance(node, AlwaysComb) and not isinstance(node, AlwaysFF) and not isinstance(node, AlwaysLatch): # This is a plain 'always @(...)'
-            self._add_violation(Rules.ALWAYSSTAR, node)
+        #Nothing below can report anything (e.g. in Struct modules), skip the block body entirely
+        if not self._any_enabled(self.ALWAYS_BODY_RULES):
+            return
 
         is_target_always_block = False
 
@@ -608,6 +1237,23 @@ class VerilogLinter(NodeVisitor):
                     is_target_always_block = True; break
                 if isinstance(sens_item, Sens) and isinstance(sens_item.sig, Identifier) and sens_item.sig.name == '*':
                     is_target_always_block = True; break
+
+        #Index every assignment in the block once, all the checks query it
+        original_state = (self._assignment_index, self._blocking_assignments, self._nonblocking_assignments)
+        self._assignment_index = AssignmentIndex(self._get_assigned_lhs_info)
+        self._blocking_assignments, self._nonblocking_assignments = self._assignment_index.build(node.statement)
+        try:
+            self._visit_always_statements(node, is_target_always_block)
+        finally:
+            self._assignment_index, self._blocking_assignments, self._nonblocking_assignments = original_state
+
+    def _visit_always_statements(self, node, is_target_always_block):
+        """
+        Visits the statements of an always block, raising the always block events around them.
+
+        node: The always block node to visit.
+        is_target_always_block: True for always_comb or star sensitivity lists
+        """
         statements_to_process = []
         #No statements here
         if node.statement is None: pass
@@ -622,45 +1268,22 @@ class VerilogLinter(NodeVisitor):
             if statements_to_process:
                 for stmt in statements_to_process:
                     self.visit(stmt)
-            
-            # --- XPROP Rule: Check for missing XPROPs using Regex results ---
-            for sig_name, (assign_lineno, cond_type_str) in self._conditionally_assigned_signals_info.items():
-                if sig_name not in self.current_module_xprop_seq:
-                    self._add_violation(Rules.XPROP, node, name=sig_name, type=cond_type_str)
-                if sig_name in self.current_module_xprop_comb:
-                    self._add_violation(Rules.WRONGXPROP, node, name=sig_name)
+            self._run_checks(node, ON_FF_EXIT)
         
         #If its not a always_comb or star sensitivity list, we dont care just keep going and check children
         if not is_target_always_block:
             #Here is the always_ff or always_latch block, need to check rules
-            blocking_assignments = []
-            if node.statement:
-                self._find_blocking_assignments_in_statement(node.statement, blocking_assignments)
-            
-            for ba_node in blocking_assignments:
-                self._add_violation(Rules.BLKSEQ, ba_node)
-            #Check for Asynchronous resets by only allow posedge clk in the sens list
-            for sens_item in node.sens_list.list:
-                if isinstance(sens_item, Sens):
-                    if not isinstance(sens_item.sig, Identifier) or (sens_item.sig.name != 'clk' and sens_item.sig.name != 'clk_in'):
-                        self._add_violation(Rules.ASYNCRESET, node)
-                if isinstance(sens_item, Sens) and sens_item.type == 'negedge':
-                    self._add_violation(Rules.NEGEDGE, node)
+            self._run_checks(node, ON_SEQUENTIAL)
             return
 
         # If we are here, we are in an always_comb block
-        nonblocking_assignments = []
-        if node.statement:
-            self._find_nonblocking_assignments_in_statement(node.statement, nonblocking_assignments)
-        
-        for nba_node in nonblocking_assignments:
-            self._add_violation(Rules.NONBLKCOMBI, nba_node)
 
         #Save original state
         original_in_always_comb = self._in_always_comb
         original_top_level_full_defaults = self._always_comb_top_level_full_defaults.copy()
         original_rule1_signals_flagged = self._rule1_signals_flagged_in_current_always.copy()
         original_always_comb_lineno = self._always_comb_lineno
+        original_always_statements = self._always_statements
 
         #Set the state for entering an always comb block
         self._in_always_comb = True
@@ -673,49 +1296,110 @@ class VerilogLinter(NodeVisitor):
         self._always_comb_top_level_x_defaults = set()
         
         self._rule1_signals_flagged_in_current_always = set()
-        
-        #This is for the first rule. Identifies all the non conditional assignments at the top level
-        direct_conditional_encountered_in_pass1 = False
-        if statements_to_process:
-            #Iterate through all the statements in the always_comb block
-            for stmt in statements_to_process:
-                is_assignment = isinstance(stmt, (NonblockingSubstitution, BlockingSubstitution))
-                is_conditional = isinstance(stmt, (IfStatement, CaseStatement, CasexStatement, CasezStatement))
-                if not direct_conditional_encountered_in_pass1:
-                    if is_assignment:
-                        #Get the assigned LHS info
-                        lhs_info_set = self._get_assigned_lhs_info(stmt)
-                        for name, assign_type, _ in lhs_info_set:
-                            if assign_type == 'full':
-                                #add to list of signals assigned at the top level
-                                self._always_comb_top_level_full_defaults.add(name)
-                                if is_x_assignment(stmt):
-                                    self._always_comb_top_level_x_defaults.add(name)
-                    #If its not an assignment, we need to check if it is a conditional statement
-                    elif is_conditional:
-                        #Set the conditional flag to found
-                        direct_conditional_encountered_in_pass1 = True
-                elif is_assignment:
-                    # If we have a conditional statement AND we have a non conditional assigment we have a violation if the rule is enabled
-                    self._add_violation(Rules.ASSIGNORDER, stmt)
+        self._always_statements = statements_to_process
+
+        self._run_checks(node, ON_COMB_ENTER)
         
         #Visit all the children statements
         if statements_to_process:
                 for stmt in statements_to_process:
                     self.visit(stmt)
-            
-        # --- XPROP Rule: Check for missing XPROPs using Regex results ---
-        for sig_name, (assign_lineno, cond_type_str) in self._conditionally_assigned_signals_info.items():
-            if sig_name not in self.current_module_xprop_comb:
-                self._add_violation(Rules.XPROP, node, name=sig_name, type=cond_type_str)
-            if sig_name in self.current_module_xprop_seq:
-                self._add_violation(Rules.WRONGXPROP, node, name=sig_name)
+
+        self._run_checks(node, ON_COMB_EXIT)
 
         #we are done so restore the state
         self._in_always_comb = original_in_always_comb
         self._always_comb_lineno = original_always_comb_lineno
         self._always_comb_top_level_full_defaults = original_top_level_full_defaults
         self._rule1_signals_flagged_in_current_always = original_rule1_signals_flagged
+        self._always_statements = original_always_statements
+
+    @rule_check(Rules.ALWAYSFF, on="AlwaysFF")
+    def check_always_ff(self, node):
+        #Rule: Check for disallowed always_ff this should technically get caught by the preprocessor
+        self._add_violation(Rules.ALWAYSFF, node)
+
+    @rule_check(Rules.ALWAYSSTAR, on="Always")
+    def check_generic_always(self, node):
+        #Rule: Check for generic 'always @(...)' when specific types are required
+        #Only a plain 'always @(...)' has the node type Always
+        self._add_violation(Rules.ALWAYSSTAR, node)
+
+    @rule_check(Rules.XPROP, Rules.WRONGXPROP, on=ALWAYS_NODES, event=ON_FF_EXIT)
+    def check_seq_xprop(self, node):
+        # --- XPROP Rule: Check for missing XPROPs using Regex results ---
+        for sig_name, (assign_lineno, cond_type_str) in self._conditionally_assigned_signals_info.items():
+            if sig_name not in self.current_module_xprop_seq:
+                self._add_violation(Rules.XPROP, node, name=sig_name, type=cond_type_str)
+            if sig_name in self.current_module_xprop_comb:
+                self._add_violation(Rules.WRONGXPROP, node, name=sig_name)
+
+    @rule_check(Rules.BLKSEQ, on=ALWAYS_NODES, event=ON_SEQUENTIAL)
+    def check_blocking_in_seq(self, node):
+        for ba_node in self._blocking_assignments:
+            self._add_violation(Rules.BLKSEQ, ba_node)
+
+    @rule_check(Rules.ASYNCRESET, Rules.NEGEDGE, on=ALWAYS_NODES, event=ON_SEQUENTIAL)
+    def check_sensitivity_list(self, node):
+        #Check for Asynchronous resets by only allow posedge clk in the sens list
+        for sens_item in node.sens_list.list:
+            if isinstance(sens_item, Sens):
+                if not isinstance(sens_item.sig, Identifier) or (sens_item.sig.name != 'clk' and sens_item.sig.name != 'clk_in'):
+                    self._add_violation(Rules.ASYNCRESET, node)
+            if isinstance(sens_item, Sens) and sens_item.type == 'negedge':
+                self._add_violation(Rules.NEGEDGE, node)
+
+    @rule_check(Rules.NONBLKCOMBI, on=ALWAYS_NODES, event=ON_COMB_ENTER)
+    def check_nonblocking_in_comb(self, node):
+        for nba_node in self._nonblocking_assignments:
+            self._add_violation(Rules.NONBLKCOMBI, nba_node)
+
+    @rule_check(Rules.LATCH, Rules.ASSIGNORDER, on=ALWAYS_NODES, event=ON_COMB_ENTER)
+    def check_top_level_defaults(self, node):
+        """
+        This is for the first rule. Identifies all the non conditional assignments at the top level
+        of an always_comb block, which the latch rule checks against, and the ones after a conditional.
+        """
+        direct_conditional_encountered_in_pass1 = False
+        #Bits assigned by partial assignments, enough of them count as a full default
+        coverage = None
+        #Iterate through all the statements in the always_comb block
+        for stmt in self._always_statements:
+            is_assignment = isinstance(stmt, (NonblockingSubstitution, BlockingSubstitution))
+            is_conditional = isinstance(stmt, (IfStatement, CaseStatement, CasexStatement, CasezStatement))
+            if not direct_conditional_encountered_in_pass1:
+                if is_assignment:
+                    #Get the assigned LHS info
+                    lhs_info_set = self._assignment_index.lhs_info(stmt)
+                    for name, assign_type, _ in lhs_info_set:
+                        if assign_type == 'full':
+                            #add to list of signals assigned at the top level
+                            self._always_comb_top_level_full_defaults.add(name)
+                            if is_x_assignment(stmt):
+                                self._always_comb_top_level_x_defaults.add(name)
+                    if any(assign_type == 'partial' for _, assign_type, _ in lhs_info_set):
+                        if coverage is None:
+                            coverage = BitCoverage(self._get_declared_ranges())
+                        for name, bits in self._get_assigned_bits(stmt, coverage).items():
+                            #e.g. x[3:0] = ...; x[7:4] = ...; is a default for all of x
+                            if coverage.add(name, bits):
+                                self._always_comb_top_level_full_defaults.add(name)
+                #If its not an assignment, we need to check if it is a conditional statement
+                elif is_conditional:
+                    #Set the conditional flag to found
+                    direct_conditional_encountered_in_pass1 = True
+            elif is_assignment:
+                # If we have a conditional statement AND we have a non conditional assigment we have a violation if the rule is enabled
+                self._add_violation(Rules.ASSIGNORDER, stmt)
+
+    @rule_check(Rules.XPROP, Rules.WRONGXPROP, on=ALWAYS_NODES, event=ON_COMB_EXIT)
+    def check_comb_xprop(self, node):
+        # --- XPROP Rule: Check for missing XPROPs using Regex results ---
+        for sig_name, (assign_lineno, cond_type_str) in self._conditionally_assigned_signals_info.items():
+            if sig_name not in self.current_module_xprop_comb:
+                self._add_violation(Rules.XPROP, node, name=sig_name, type=cond_type_str)
+            if sig_name in self.current_module_xprop_seq:
+                self._add_violation(Rules.WRONGXPROP, node, name=sig_name)
 
     def visit_IfStatement(self, node):
         """
@@ -723,13 +1407,25 @@ class VerilogLinter(NodeVisitor):
 
         node: The if statement node to visit.
         """
-        signals_in_if = self._collect_all_lhs_in_statement_tree(node)
+        # Original traversal
+        if node.cond: self.visit(node.cond)
+        if node.true_statement: self.visit(node.true_statement)
+        if node.false_statement: self.visit(node.false_statement)
+
+    @rule_check(Rules.LATCH, Rules.XPROP, Rules.WRONGXPROP, on="IfStatement")
+    def check_if_statement(self, node):
+        """
+        Records the signals an 'if' statement assigns for the XPROP rules and
+        applies the latch rule to them.
+
+        node: The if statement node to check.
+        """
+        signals_in_if = self._get_assignment_index().lhs(node)
         for name, _, lineno in signals_in_if:
             # If a signal is not already recorded as conditionally assigned record it
             if name not in self._conditionally_assigned_signals_info: 
                 self._conditionally_assigned_signals_info[name] = (lineno, "if-statement")
 
-        # signals_driven_in_if_structure = self._collect_all_lhs_in_statement_tree(node)
         base_names_in_if = {name for name, _, _ in signals_in_if}
 
         #Only apply latch rules inside an identified always_comb
@@ -746,11 +1442,6 @@ class VerilogLinter(NodeVisitor):
                         if Rules.LATCH.name in self.current_ruleset:
                             self._rule1_signals_flagged_in_current_always.add(rule_key_any)
 
-        # Original traversal
-        if node.cond: self.visit(node.cond)
-        if node.true_statement: self.visit(node.true_statement)
-        if node.false_statement: self.visit(node.false_statement)
-
     def visit_Block(self, node):
         """
         Visits a block statement in the AST.
@@ -767,61 +1458,68 @@ class VerilogLinter(NodeVisitor):
 
         node: The case statement node to visit.
         """ 
-        if self._in_always_comb:        
-            #Rule 3: Check for default case and X assignments in default case
-            has_default_case = False
-            default_case_node = None
-            
-            #Check if the case statement has a default case
-            if node.caselist:
-                for case_item in node.caselist:
-                    #Check if this is a default case
-                    if case_item.cond is None or (isinstance(case_item.cond, str) and case_item.cond == 'default'):
-                        has_default_case = True
-                        default_case_node = case_item
-                        break
-                    
-            #Rule 3A: Check if default case is present
-            if not has_default_case:
-                self._add_violation(Rules.CASEDEFAULT, node)
-            
-            #Rule 3B: If default case exists, check if assignments in default case are X values
-            if has_default_case and default_case_node:
-                #Get all signals assigned in any part of the case statement
-                all_case_assignments = self._collect_all_lhs_in_statement_tree(node)
-                all_case_signals = {name for name, _, _ in all_case_assignments}
-                
-                #Get assignments in the default case
-                default_assignments = self._collect_all_lhs_in_statement_tree(default_case_node.statement)
-                default_assigns_signals = {name for name, _, _ in default_assignments}
-                
-                #Check if all assigned signals in the case statement are assigned X in default
-                for signal_name in all_case_signals:
-                    #If the signal is assigned in default case, check if it's assigned X
-                    if signal_name in default_assigns_signals:
-                        #Find the assignment statement(s) in default case for this signal
-                        default_signal_assignments = []
-                        
-                        self.find_assignments_in_node(default_case_node.statement, signal_name, default_signal_assignments)
-                        
-                        #Check if any assignment for this signal in default case is not to X
-                        non_x_assignments = []
-                        for assign_stmt in default_signal_assignments:
-                            if not is_x_assignment(assign_stmt):
-                                non_x_assignments.append(assign_stmt)
-                        
-                        if non_x_assignments:
-                            #At least one assignment in default case is not to X
-                            self._add_violation(Rules.XASSIGN, node, name=signal_name)
-                    else:
-                        #Signal is not assigned in default case at all
-                        self._add_violation(Rules.CASEINCOMPLETE, node, name=signal_name)
-            # End Rule 3
         #Visit the condition and case items                    
         if node.comp: self.visit(node.comp)
         if node.caselist:
             for item in node.caselist: self.visit(item)
 
+    @rule_check(Rules.CASEDEFAULT, Rules.XASSIGN, Rules.CASEINCOMPLETE, on="CaseStatement")
+    def check_case_statement(self, node):
+        """
+        Applies the case rules to a case statement inside an always_comb block.
+
+        node: The case statement node to check.
+        """
+        if not self._in_always_comb:
+            return
+        #Rule 3: Check for default case and X assignments in default case
+        has_default_case = False
+        default_case_node = None
+        
+        #Check if the case statement has a default case
+        if node.caselist:
+            for case_item in node.caselist:
+                #Check if this is a default case
+                if case_item.cond is None or (isinstance(case_item.cond, str) and case_item.cond == 'default'):
+                    has_default_case = True
+                    default_case_node = case_item
+                    break
+                
+        #Rule 3A: Check if default case is present
+        if not has_default_case:
+            self._add_violation(Rules.CASEDEFAULT, node)
+        
+        #Rule 3B: If default case exists, check if assignments in default case are X values
+        if has_default_case and default_case_node:
+            assignment_index = self._get_assignment_index()
+            #Get all signals assigned in any part of the case statement
+            all_case_assignments = assignment_index.lhs(node)
+            all_case_signals = {name for name, _, _ in all_case_assignments}
+            
+            #Get assignments in the default case
+            default_assignments = assignment_index.lhs(default_case_node.statement)
+            default_assigns_signals = {name for name, _, _ in default_assignments}
+            
+            #Check if all assigned signals in the case statement are assigned X in default
+            for signal_name in all_case_signals:
+                #If the signal is assigned in default case, check if it's assigned X
+                if signal_name in default_assigns_signals:
+                    #Find the assignment statement(s) in default case for this signal
+                    default_signal_assignments = assignment_index.assignments_to(default_case_node.statement, signal_name)
+                    
+                    #Check if any assignment for this signal in default case is not to X
+                    non_x_assignments = []
+                    for assign_stmt in default_signal_assignments:
+                        if not is_x_assignment(assign_stmt):
+                            non_x_assignments.append(assign_stmt)
+                    
+                    if non_x_assignments:
+                        #At least one assignment in default case is not to X
+                        self._add_violation(Rules.XASSIGN, node, name=signal_name)
+                else:
+                    #Signal is not assigned in default case at all
+                    self._add_violation(Rules.CASEINCOMPLETE, node, name=signal_name)
+
     def visit_Case(self, node):
         """
         Visits the case item within a case statement.
@@ -839,10 +1537,48 @@ class VerilogLinter(NodeVisitor):
                 self.visit(node.cond)
         if node.statement: self.visit(node.statement)
 
+def _register_checks(cls):
+    """
+    Collects the checks of a linter class into its CHECKS, VISITOR_RULES and
+    ALWAYS_BODY_RULES, and makes sure they agree with the `nodes` of every rule.
+
+    Raises: ValueError if a check runs on a node type its rules do not list, or a
+            rule lists a node type no check of the rule runs on
+    """
+    checks = []
+    for name, method in cls.__dict__.items():
+        if hasattr(method, "rule_check"):
+            types, event, rules = method.rule_check
+            checks.append((types, event, rules, name))
+    cls.CHECKS = tuple(checks)
+    cls.VISITOR_RULES = {name: rules for _, _, rules, name in checks}
+    cls.ALWAYS_BODY_RULES = frozenset().union(*(
+        rules for types, event, rules, _ in checks
+        if event not in (ON_ENTER, ON_MODULE_ITEM) or types & ALWAYS_BODY_NODES))
+
+    covered = set()
+    for types, _, rules, name in checks:
+        for rule_name in rules:
+            missing = types - set(getattr(Rules, rule_name).nodes)
+            if missing:
+                raise ValueError(f"{name} checks {rule_name} on {', '.join(sorted(missing))}, which {rule_name}.nodes does not list")
+            covered.update((rule_name, type_name) for type_name in types)
+    for rule_name, rule in Rules.__dict__.items():
+        for type_name in getattr(rule, "nodes", ()):
+            if (rule_name, type_name) not in covered:
+                raise ValueError(f"{rule_name}.nodes lists {type_name}, but no check of {rule_name} runs on it")
+
+_register_checks(VerilogLinter)
    
-def main(args_list: Optional[List[str]] = None):
+def main(args_list: Optional[List[str]] = None, sources: Optional[dict] = None):
     """
     Main function to parse command line arguments and run the linter.
+    A thin command line wrapper around lint_files.
+
+    sources: If a dictionary of file name to content is given, the files to lint and
+             everything they include are taken from it instead of from disk.
+
+    Returns: (0, Report) if nothing was found, otherwise exits with status 1
     """
     global LINT_CONFIG
     INFO = "Verilog Linter for Combinational Logic Conventions"
@@ -860,6 +1596,7 @@ def main(args_list: Optional[List[str]] = None):
     parser.add_argument("-xc", "--xpropcomb", dest="comb_xprop_list", default=None, help="JSON string of a dictionary mapping modules to signals that use comb Xprop.\n Example: '{\"module_a\": [\"sig1\", \"sig2\"]}'")
     parser.add_argument("-xs", "--xpropseq", dest="seq_xprop_list", default=None, help="JSON string of a dictionary mapping modules to signals that use seq Xprop.\n Example: '{\"module_a\": [\"sig1\", \"sig2\"]}'")
     parser.add_argument("-o", "--override", dest="override", default=None, help="JSON dictionary of rules to override for current module")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Always parse files instead of reusing cached ASTs.")
     
     args = parser.parse_args(args_list)
 
@@ -901,7 +1638,7 @@ def main(args_list: Optional[List[str]] = None):
             print(f"Example: '{{\"module_a\": [\"rule1\", \"rule2\"]}}'", file=sys.stderr)
             sys.exit(1)
     
-    LINT_CONFIG = load_lint_config(args.config_file)
+    LINT_CONFIG = load_lint_config_cached(args.config_file)
     #If override is provided, update the config with the overrides, this should only be for one module
     if override_dictonary:
         LINT_CONFIG.update(override_dictonary) # Update the xprop_dict with overrides
@@ -911,69 +1648,115 @@ def main(args_list: Optional[List[str]] = None):
         parser.print_help()
         sys.exit(1)
 
-    total_violations_across_files = 0
-    for f_path in filelist:
-        if not os.path.exists(f_path):
-            print(f"Error: File not found: {f_path}", file=sys.stderr)
-            total_violations_across_files += 1 # Count as an error
+    report = lint_files(filelist, LINT_CONFIG, comb_xprop_dict, seq_xprop_dict, sources=sources,
+                        include=args.include, define=args.define, use_cache=not args.no_cache)
+    return finish(print_report(report)), report
+
+#--------------------
+# Programmatic API
+#--------------------
+
+def lint_files(paths, config, xprop_comb=None, xprop_seq=None, sources=None, include=None, define=None, use_cache=True) -> Report:
+    """
+    Lints Verilog files in-process without printing anything.
+
+    paths: Files to lint
+    config: Dictionary of module name to the list of rule names enabled for it (see load_lint_config)
+    xprop_comb: Dictionary of module name to the signals passed to ECE2300_XPROP macros
+    xprop_seq: Dictionary of module name to the signals passed to ECE2300_SEQ_XPROP macros
+    sources: If a dictionary of file name to content is given, the files to lint and
+             everything they include are taken from it instead of from disk. Files on
+             disk are read with load_sources, so both are parsed by parse_modules
+    include: Include directories for the Verilog preprocessor
+    define: Macros to define for the Verilog preprocessor (e.g. "SYNTHESIS")
+    use_cache: Reuse parsed ASTs from memory and from the on-disk cache
+
+    Returns: A Report
+    """
+    import traceback
+
+    rule_sets = compile_rule_sets(config)
+    xprop_comb = xprop_comb or {}
+    xprop_seq = xprop_seq or {}
+    include = list(include or [])
+    define = list(define or [])
+
+    # Parsed ASTs are cached by content so unchanged modules skip parsing,
+    # and their violations are kept for this process so they skip linting too
+    ast_cache = session_ast_cache() if use_cache else None
+    violation_cache = _SESSION_VIOLATION_CACHE if use_cache else None
+
+    # Modules checked with structural rules only are read without the parser when possible
+    def read(text):
+        return read_netlist_module(text, lambda module: rule_sets.get(module, frozenset()) <= STRUCTURAL_RULES)
+
+    report = Report()
+    for f_path in paths:
+        if sources is not None:
+            if f_path not in sources:
+                report.entries.append((f_path, None, f"Error: File not found: {f_path}", None))
+                continue
+        elif not os.path.exists(f_path):
+            report.entries.append((f_path, None, f"Error: File not found: {f_path}", None))
             continue
-        
-        current_file_violations = 0
-        violation_output_lines = [] # For writing to file
-        include_dirs = [os.path.dirname(f_path)] + (args.include or [])
-        
-        #------------------------------------------------
-        # Change the directory to the temporary directory
-        #------------------------------------------------
-        original_dir = os.getcwd()
-        os.chdir(args.include[0])
-        
+
         try:
-            ast, directives = parse([f_path], preprocess_include=include_dirs, preprocess_define=args.define)
-            linter = VerilogLinter(config=LINT_CONFIG)
-            linter._xprop_macro_comb_out_signals_found_by_regex = comb_xprop_dict
-            linter._xprop_macro_seq_out_signals_found_by_regex = seq_xprop_dict
+            with TIMINGS.stage("parse"):
+                if sources is not None:
+                    file_sources, include_dirs = sources, include
+                else:
+                    # Files on disk are read with everything they include and parsed the same way
+                    include_dirs = [os.path.dirname(f_path)] + include
+                    file_sources = load_sources(f_path, include_dirs)
+                modules = parse_modules(f_path, file_sources, preprocess_include=include_dirs, preprocess_define=define,
+                                        cache=ast_cache, read=read)
 
-            linter.visit(ast)
+            with TIMINGS.stage("visit"):
+                violations = lint_modules(modules, rule_sets, xprop_comb, xprop_seq, f_path, cache=violation_cache)
 
-            # ast.show()
+            report.entries.append((f_path, violations, None, None))
 
-            if linter.violations:
-                current_file_violations = len(linter.violations)
-                total_violations_across_files += current_file_violations
-                
-                print(f"Found {current_file_violations} violation(s):")
-                violation_output_lines.append(f"Violations for file: {f_path}\n")
-                violation_output_lines.append(f"Found {current_file_violations} violation(s):\n")
+        except PreprocessorError as e:
+            report.entries.append((f_path, None, f"Error preprocessing file {f_path}:\n{e}", None))
+        except Exception as e:
+            report.entries.append((f_path, None, f"Error processing file {f_path}: {e}", traceback.format_exc()))
 
-                sorted_violations = sorted(linter.violations, key=lambda x: (x[0] or "", x[3], x[1]))
-                for mod_name, rule_id, msg, lineno in sorted_violations:
-                    module_prefix = f"Module '{mod_name}'" if mod_name else ""
-                    
-                    console_output = f"  - {module_prefix}: [{rule_id}] {msg}"
-                    file_output_line = f"- {module_prefix}: [{rule_id}] {msg}\n"
-                    
-                    print(console_output)
-                    violation_output_lines.append(file_output_line)
+    return report
 
-        except Exception as e:
-            error_message = f"Error processing file {f_path}: {e}"
-            print(error_message, file=sys.stderr)
+def lint_modules(modules, rule_sets, xprop_comb, xprop_seq, filename, cache=None) -> List[Violation]:
+    """
+    Lints the modules returned by parse_modules one at a time.
 
-            import traceback
-            traceback.print_exc()
-            total_violations_across_files +=1 #Count critical error as a violation for exit code
-        
-        #--------------------------
-        # Change back directories
-        #-------------------------
-        os.chdir(original_dir)
+    If a MemoryCache is given, the violations of each module are looked up by the
+    key of its text, its rules and its xprop signals first, and the module is only
+    visited on a miss.
 
-    if total_violations_across_files > 0:
-        print(f"\nLinting finished with {total_violations_across_files} total violation(s)/error(s).")
-        sys.exit(1)
-    else:
-        return
+    Returns: The Violations found, with the line numbers of the file
+    """
+    violations = {}
+    for offset, key, ast in modules:
+        found = None
+        if cache is not None and key is not None:
+            definitions = getattr(getattr(ast, 'description', None), 'definitions', None) or ()
+            names = [definition.name for definition in definitions if isinstance(definition, ModuleDef)]
+            violations_key = content_key("violations", key, *(
+                repr((name, sorted(rule_sets.get(name, ())), xprop_comb.get(name), xprop_seq.get(name))) for name in names))
+            found = cache.get(violations_key)
+
+        if found is None:
+            linter = VerilogLinter(config=rule_sets, filename=filename)
+            linter._xprop_macro_comb_out_signals_found_by_regex = xprop_comb
+            linter._xprop_macro_seq_out_signals_found_by_regex = xprop_seq
+            linter.visit(ast)
+            # ast.show()
+            found = linter.violations
+            if cache is not None and key is not None:
+                cache.put(violations_key, found)
+
+        for v in found:
+            v = v._replace(lineno=v.lineno + offset, file=filename)
+            violations.setdefault(v.key, v)
+    return list(violations.values())
 
 def cli():
     """ Command line interface wrapper"""
@@ -0,0 +1,312 @@
+"""
+ECE2300 Netlist Reader
+Builds the AST of a gate level module straight from its tokens, without running
+the Pyverilog parser.
+
+The Struct and GL rule sets (STRUCTURAL_RULES) only look at the items of a module,
+the two sides of every assign and the type and ports of every instance. Netlists
+are mostly long lists of gate instances, and PLY takes far longer to parse them
+than the checks take to run. read_netlist_module understands a small subset of
+Verilog: ANSI or plain port lists, wire/logic declarations, assigns of signals,
+bit selects, part selects, literals and concatenations, and instances with
+ordered or named ports. For anything else (always blocks, parameters, operators,
+anything Pyverilog might reject, ...) it returns None and the module is parsed
+as usual.
+
+The AST only has what the structural rules look at: declarations are read but
+left out, and so are the ports of the module.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+from lint.lint_rules import Rules
+from pyverilog.vparser.ast import (Assign, Concat, Description, Identifier, Instance, InstanceList, IntConst,
+                                   LConcat, Lvalue, ModuleDef, Paramlist, Partselect, PortArg, Pointer, Portlist,
+                                   Rvalue, Source)
+from pyverilog.vparser.lexer import VerilogLexer
+
+# Rules that only look at what read_netlist_module builds. NOSPBLK looks for always
+# blocks, functions and the like, which the reader never accepts.
+STRUCTURAL_RULES = frozenset(rule.name for rule in (
+    Rules.NOSPBLK, Rules.BADLHS, Rules.BADRHS, Rules.COMPLEXLHS, Rules.COMPLEXRHS, Rules.PRIMONLY, Rules.NOMODULE))
+
+# Tokens as Pyverilog's lexer splits them, restricted to the subset the reader
+# understands. Numbers must not run into anything (a float, a cast, a bad digit).
+TOKEN_PATTERN = re.compile(r"""
+    [ \t]*
+  (?:(?P<newlines>\n+)
+  | (?P<skip>`[^\n]*\n|//[^\n]*\n|/\*[\s\S]*?\*/)
+  | (?P<number>(?:[0-9]*'(?:[bB][01xXzZ?][01xXzZ?_]*|[oO][0-7xXzZ?][0-7xXzZ?_]*
+                           |[hH][0-9a-fA-FxXzZ?][0-9a-fA-FxXzZ?_]*|[dD][0-9xXzZ?][0-9xXzZ?_]*)
+                 |[0-9][0-9_]*)(?![\w$.']))
+  | (?P<id>[a-zA-Z_][a-zA-Z_0-9$]*)
+  | (?P<punct>[()\[\]{},;:.=+\-*/])
+  | \Z)
+""", re.VERBOSE)
+
+# Token kinds of keywords (e.g. "MODULE"), everything else is an "ID"
+KEYWORDS = VerilogLexer.reserved
+
+# Net types accepted in port lists and declarations
+NET_TYPES = ("WIRE", "LOGIC")
+
+class _Unsupported(Exception):
+    """Raised for anything the reader does not understand, so the module is parsed instead."""
+
+def tokenize(text) -> Optional[List[Tuple[str, str, int]]]:
+    """
+    Splits text into tokens, skipping whitespace, comments and directives like
+    Pyverilog's lexer does.
+
+    Returns: List of (kind, text, line number), the kind being the keyword kind,
+             "ID", "NUMBER" or the punctuation character itself
+    Returns: None if the text has anything else (strings, escaped names, operators, ...)
+    """
+    tokens = []
+    lineno = 1
+    pos = 0
+    for m in TOKEN_PATTERN.finditer(text):
+        # Every match must start where the last one ended, or something was not understood
+        if m.start() != pos:
+            return None
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "id":
+            value = m.group(kind)
+            tokens.append((KEYWORDS.get(value, "ID"), value, lineno))
+        elif kind == "punct":
+            value = m.group(kind)
+            tokens.append((value, value, lineno))
+        elif kind == "number":
+            tokens.append(("NUMBER", m.group(kind), lineno))
+        elif kind is not None:
+            lineno += m.group(kind).count("\n")
+        else:
+            # Only trailing whitespace is left
+            return tokens if pos == len(text) else None
+    return None
+
+class _NetlistReader:
+    """Recursive descent over the tokens of one module, building the AST as Pyverilog would."""
+    def __init__(self, tokens, accept_module=None):
+        self.tokens = tokens
+        self.accept_module = accept_module
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def line(self) -> int:
+        """Returns: The line of the next token"""
+        return self.tokens[self.pos][2] if self.pos < len(self.tokens) else self.tokens[-1][2]
+
+    def take(self, *kinds) -> Tuple[str, str, int]:
+        """Returns: The next token, which must be one of kinds (if given)"""
+        if self.pos >= len(self.tokens):
+            raise _Unsupported()
+        token = self.tokens[self.pos]
+        if kinds and token[0] not in kinds:
+            raise _Unsupported()
+        self.pos += 1
+        return token
+
+    def accept(self, kind) -> bool:
+        if self.peek() == kind:
+            self.pos += 1
+            return True
+        return False
+
+    def module(self) -> ModuleDef:
+        _, _, lineno = self.take("MODULE")
+        _, name, _ = self.take("ID")
+        if self.accept_module is not None and not self.accept_module(name):
+            raise _Unsupported()
+        if self.accept("(") and not self.accept(")"):
+            self.port_list()
+        self.take(";")
+        items = []
+        while self.peek() != "ENDMODULE":
+            item = self.item()
+            if item is not None:
+                items.append(item)
+        self.take("ENDMODULE")
+        if self.pos != len(self.tokens):
+            raise _Unsupported()
+        return ModuleDef(name, Paramlist(()), Portlist((), lineno=lineno), tuple(items), lineno=lineno)
+
+    def port_list(self) -> None:
+        if self.peek() == "ID":
+            # module M (a, b, c); with the directions declared below
+            self.take("ID")
+            while self.accept(","):
+                self.take("ID")
+        else:
+            self.port()
+            while self.accept(","):
+                if self.peek() == "ID":
+                    # Another port with the direction and type of the one before
+                    self.take("ID")
+                else:
+                    self.port()
+        self.take(")")
+
+    def port(self) -> None:
+        self.take("INPUT", "OUTPUT", "INOUT")
+        if self.peek() in NET_TYPES:
+            self.take()
+        self.accept("SIGNED")
+        if self.peek() == "[":
+            self.width()
+        self.take("ID")
+
+    def width(self) -> None:
+        self.take("[")
+        self.constant()
+        self.take(":")
+        self.constant()
+        self.take("]")
+
+    def constant(self) -> None:
+        """Reads a constant expression of names, numbers, + - * / and parentheses."""
+        self.term()
+        while self.peek() in ("+", "-", "*", "/"):
+            self.take()
+            self.term()
+
+    def term(self) -> None:
+        if self.accept("("):
+            self.constant()
+            self.take(")")
+        else:
+            self.take("ID", "NUMBER")
+
+    def item(self):
+        """Returns: The AST node of the next module item, or None for a declaration"""
+        kind = self.peek()
+        if kind in NET_TYPES:
+            self.declaration()
+            return None
+        if kind == "ASSIGN":
+            return self.assign()
+        if kind in ("ID", "SENS_OR"):
+            return self.instance()
+        raise _Unsupported()
+
+    def declaration(self) -> None:
+        self.take()
+        self.accept("SIGNED")
+        if self.peek() == "[":
+            self.width()
+        self.take("ID")
+        while self.accept(","):
+            self.take("ID")
+        self.take(";")
+
+    def assign(self) -> Assign:
+        _, _, lineno = self.take("ASSIGN")
+        left_lineno = self.line()
+        left = Lvalue(self.lvalue(), lineno=left_lineno)
+        self.take("=")
+        right_lineno = self.line()
+        right = Rvalue(self.expression(), lineno=right_lineno)
+        self.take(";")
+        return Assign(left, right, lineno=lineno)
+
+    def lvalue(self):
+        if self.peek() == "{":
+            _, _, lineno = self.take("{")
+            items = [self.lvalue()]
+            while self.accept(","):
+                items.append(self.lvalue())
+            self.take("}")
+            return LConcat(tuple(items), lineno=lineno)
+        return self.select()
+
+    def expression(self):
+        kind = self.peek()
+        if kind == "{":
+            _, _, lineno = self.take("{")
+            items = [self.expression()]
+            while self.accept(","):
+                items.append(self.expression())
+            self.take("}")
+            return Concat(tuple(items), lineno=lineno)
+        if kind == "NUMBER":
+            _, value, lineno = self.take()
+            return IntConst(value, lineno=lineno)
+        return self.select()
+
+    def select(self):
+        """Reads a name, a bit select or a part select (indices are single names or numbers)."""
+        _, name, lineno = self.take("ID")
+        var = Identifier(name, lineno=lineno)
+        if not self.accept("["):
+            return var
+        first = self.index()
+        if self.accept(":"):
+            second = self.index()
+            self.take("]")
+            return Partselect(var, first, second, lineno=lineno)
+        self.take("]")
+        if self.peek() == "[":
+            raise _Unsupported()
+        return Pointer(var, first, lineno=lineno)
+
+    def index(self):
+        kind, value, lineno = self.take("ID", "NUMBER")
+        return IntConst(value, lineno=lineno) if kind == "NUMBER" else Identifier(value, lineno=lineno)
+
+    def instance(self) -> InstanceList:
+        _, module, lineno = self.take("ID", "SENS_OR")
+        instances = []
+        # Gates may leave out the instance name, but then every instance in the list does
+        named = self.peek() != "("
+        while True:
+            name = self.take("ID")[1] if named else ""
+            instances.append(Instance(module, name, self.port_args(), (), None, lineno=lineno))
+            if not self.accept(","):
+                break
+        self.take(";")
+        return InstanceList(module, (), tuple(instances), lineno=lineno)
+
+    def port_args(self) -> tuple:
+        self.take("(")
+        args = []
+        if self.peek() == ".":
+            while True:
+                _, _, lineno = self.take(".")
+                _, port, _ = self.take("ID")
+                self.take("(")
+                arg = None if self.peek() == ")" else self.expression()
+                self.take(")")
+                args.append(PortArg(port, arg, lineno=lineno))
+                if not self.accept(","):
+                    break
+        elif self.peek() != ")":
+            while True:
+                lineno = self.line()
+                args.append(PortArg(None, self.expression(), lineno=lineno))
+                if not self.accept(","):
+                    break
+        self.take(")")
+        return tuple(args)
+
+def read_netlist_module(text, accept_module=None) -> Optional[Source]:
+    """
+    Builds the AST of text holding one module (a piece from split_modules) without
+    the parser. Line numbers count from the start of text, like parse_text.
+
+    accept_module: Called with the name of the module, which is only read if it returns True
+
+    Returns: The AST, with the module as the only definition
+    Returns: None if text has anything the reader does not understand
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    try:
+        module = _NetlistReader(tokens, accept_module).module()
+    except _Unsupported:
+        return None
+    return Source('', Description((module,), lineno=module.lineno), lineno=module.lineno)
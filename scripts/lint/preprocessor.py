@@ -7,12 +7,16 @@ Properly handles single-line and multi-line comments.
 
 import re
 import argparse
+from bisect import bisect_right
 import sys
 from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Dict, List, NamedTuple, Optional, Tuple, Set
 import os
 import sys
+from lint.resolver import SESSION_RESOLVER
+from lint.timing import TIMINGS
 
 # --- Configuration: Prohibited Constructs ---
 # This dictionary contains all the rules for prohibited Verilog constructs.
@@ -82,46 +86,151 @@ PROHIBITED_CONSTRUCTS = {
     ],
 }
 
+# Comments and strings, the only parts of the code preprocess_code changes.
+# Inside a string a backslash escapes the next character (even a newline), and a
+# quote right after an escaped backslash does not end the string. Unterminated
+# comments and strings run to the end of the code.
+COMMENT_OR_STRING_PATTERN = re.compile(
+    r'//[^\n]*'
+    r'|/\*[\s\S]*?(?:\*/|\Z)'
+    r'|"(?P<string>(?:\\[\s\S]|(?<=\\)"|[^"\\]|\\\Z)*)(?:(?P<close>")|\Z)'
+)
+STRING_ESCAPE_PATTERN = re.compile(r'\\[\s\S]')
+NOT_NEWLINE_PATTERN = re.compile(r'[^\n]')
+
+def _strip_comment_or_string(match) -> str:
+    token = match.group()
+    if token.startswith('//'):
+        return ''
+    if token.startswith('/*'):
+        # Keep the newlines so line numbers do not change
+        return '\n' * token.count('\n')
+    # Blank out the string's contents, keeping the quotes and newlines
+    body = NOT_NEWLINE_PATTERN.sub(' ', STRING_ESCAPE_PATTERN.sub('  ', match.group('string')))
+    return '"' + body + (match.group('close') or '')
+
+@lru_cache(maxsize=256)
 def preprocess_code(verilog_code: str) -> str:
-        output = []
-        in_multiline, in_string, i, n = False, False, 0, len(verilog_code)
-        while i < n:
-            if in_multiline:
-                if verilog_code[i:i+2] == '*/': in_multiline = False; i += 2
-                else:
-                    if verilog_code[i] == '\n': output.append('\n')
-                    i += 1
-                continue
-            if in_string:
-                if verilog_code[i] == '"' and (i == 0 or verilog_code[i-1] != '\\'): in_string = False; output.append('"'); i += 1
-                elif verilog_code[i] == '\\' and i + 1 < n: output.append('  '); i += 2
-                else: output.append(' ' if verilog_code[i] != '\n' else '\n'); i += 1
-                continue
-            if verilog_code[i:i+2] == '//': i = verilog_code.find('\n', i); i = n if i == -1 else i; continue
-            if verilog_code[i:i+2] == '/*': in_multiline = True; i += 2; continue
-            if verilog_code[i] == '"': in_string = True; output.append('"'); i += 1; continue
-            output.append(verilog_code[i]); i += 1
-        return "".join(output)
+    """
+    Removes comments and blanks out the contents of strings, keeping every newline.
+    Plain code between comments and strings is copied in one piece.
+    Memoized on the content since the same file is stripped by several steps.
+    """
+    return COMMENT_OR_STRING_PATTERN.sub(_strip_comment_or_string, verilog_code)
 
-class VerilogChecker:
-    def __init__(self):
-        self.prohibited_constructs = PROHIBITED_CONSTRUCTS
+def _first_chars(pattern: str) -> Optional[str]:
+    """
+    Returns every character a match of pattern can start with, ignoring a leading
+    word boundary, or None if that is not obvious from the pattern text.
+    Handles the simple shapes used in PROHIBITED_CONSTRUCTS: a literal, an escaped
+    punctuation character, `\\d`, or a group of plain words like `(nmos|pmos)`.
+    """
+    if pattern.startswith(r'\b'):
+        pattern = pattern[2:]
+    group = re.match(r'\(([\w|]+)\)', pattern)
+    if group:
+        head, chars = group.group(), {alternative[:1] for alternative in group.group(1).split('|')}
+    elif pattern.startswith(r'\d'):
+        head, chars = pattern[:2], set('0123456789')
+    elif pattern.startswith('\\') and len(pattern) > 1 and not pattern[1].isalnum():
+        head, chars = pattern[:2], {pattern[1]}
+    elif pattern and (pattern[0].isalnum() or pattern[0] in '!#%/<=_'):
+        head, chars = pattern[:1], {pattern[0]}
+    else:
+        return None
 
-    def _check_constructs(self, clean_code: str, filename: str) -> List[Dict]:
-        errors = []
-        lines = clean_code.split('\n')
-        for category, patterns_info in self.prohibited_constructs.items():
+    # An optional first token or a top level alternative could start elsewhere
+    rest = pattern[len(head):]
+    if '' in chars or rest[:1] in ('?', '*', '{') or '|' in rest:
+        return None
+    return ''.join(sorted(chars))
+
+class ConstructScanner:
+    """
+    Finds every prohibited construct in a single pass over the code.
+
+    All rules are compiled once into one alternation which is only used to find
+    candidate positions; at each candidate every rule is matched individually,
+    limited to the current line. This gives exactly the matches of running each
+    rule's finditer over each line separately, in the same order.
+    """
+    def __init__(self, prohibited_constructs: Dict[str, List[Dict]]):
+        # (compiled regex, description) for every valid rule, in declaration order
+        self.rules: List[Tuple[re.Pattern, str]] = []
+        for category, patterns_info in prohibited_constructs.items():
             for rule in patterns_info:
                 pattern, description = rule.get('pattern', ''), rule.get('description', f"Prohibited construct: {rule.get('pattern', '')}")
                 if not pattern: continue
                 try:
-                    regex = re.compile(pattern, re.IGNORECASE)
-                    for line_num, line in enumerate(lines, 1):
-                        for match in regex.finditer(line):
-                            errors.append({'file': filename, 'line': line_num, 'column': match.start() + 1, 'construct': match.group(), 'description': description, 'line_content': line.strip()})
+                    self.rules.append((re.compile(pattern, re.IGNORECASE), description))
                 except re.error as e:
                     print(f"Warning: Invalid regex pattern '{pattern}' in category '{category}': {e}", file=sys.stderr)
-        return errors
+
+        # The regex engine has no fast path for alternations starting with \b, so those
+        # share a single \b and a lookahead on the possible first characters lets it skip
+        # most positions without trying any alternative
+        patterns = [regex.pattern for regex, _ in self.rules]
+        word_patterns = [f"(?:{pattern[2:]})" for pattern in patterns if pattern.startswith(r'\b')]
+        other_patterns = [f"(?:{pattern})" for pattern in patterns if not pattern.startswith(r'\b')]
+        alternation = "|".join(other_patterns + ([r"\b(?:" + "|".join(word_patterns) + ")"] if word_patterns else []))
+        first_chars = [_first_chars(pattern) for pattern in patterns]
+        if alternation and None not in first_chars:
+            alternation = f"(?=[{re.escape(''.join(sorted(set(''.join(first_chars)))))}])(?:{alternation})"
+        self.candidates = re.compile(alternation or r"(?!)", re.IGNORECASE)
+
+    def scan(self, clean_code: str, filename: str) -> List[Dict]:
+        lines = clean_code.split('\n')
+        # Offset of the first character of every line, for mapping matches back to line/column
+        line_starts = [0]
+        for line in lines[:-1]:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+
+        found = [] # (rule index, offset, line index, match)
+        # End of each rule's previous match, so matches of one rule never overlap (as with finditer)
+        last_end = [0] * len(self.rules)
+        search = self.candidates.search
+        pos, n = 0, len(clean_code)
+        while pos <= n:
+            candidate = search(clean_code, pos)
+            if candidate is None:
+                break
+            start = candidate.start()
+            line_idx = bisect_right(line_starts, start) - 1
+            line_end = line_starts[line_idx] + len(lines[line_idx])
+            for rule_idx, (regex, _) in enumerate(self.rules):
+                if start < last_end[rule_idx]:
+                    continue
+                match = regex.match(clean_code, start, line_end)
+                if match:
+                    found.append((rule_idx, start, line_idx, match))
+                    last_end[rule_idx] = match.end()
+            pos = start + 1
+
+        found.sort(key=lambda item: (item[0], item[1]))
+        return [{'file': filename, 'line': line_idx + 1, 'column': start - line_starts[line_idx] + 1,
+                 'construct': match.group(), 'description': self.rules[rule_idx][1],
+                 'line_content': lines[line_idx].strip()}
+                for rule_idx, start, line_idx, match in found]
+
+CONSTRUCT_SCANNER = ConstructScanner(PROHIBITED_CONSTRUCTS)
+
+class VerilogChecker:
+    def __init__(self):
+        self.prohibited_constructs = PROHIBITED_CONSTRUCTS
+        self.scanner = CONSTRUCT_SCANNER
+
+    def _check_constructs(self, clean_code: str, filename: str) -> List[Dict]:
+        return self.scanner.scan(clean_code, filename)
+
+    def check_code(self, clean_code: str, filename: str) -> List[Dict]:
+        """
+        Checks Verilog code that already had its comments and strings removed (see scan_source).
+
+        Returns:
+            List[Dict]: A list of error dictionaries found in the code.
+        """
+        with TIMINGS.stage("construct_scan"):
+            return self._check_constructs(clean_code, filename)
     
     def check_content(self, verilog_content: str, filename: str) -> List[Dict]:
         """
@@ -135,21 +244,26 @@ class VerilogChecker:
             List[Dict]: A list of error dictionaries found in the content.
         """
         # Preprocess to remove comments/strings before checking
-        processed_content = preprocess_code(verilog_content)
+        with TIMINGS.stage("preprocess_code"):
+            processed_content = preprocess_code(verilog_content)
         # Run the checks on the preprocessed content
-        return self._check_constructs(processed_content, filename)
+        return self.check_code(processed_content, filename)
 
 #--------------------
 # Helper functions
 #--------------------
 
-def find_include_file(filename, include_dir):
-    for i in include_dir:
-        test = Path(os.path.join(i, filename)).resolve()
-        if test.is_file():
-            return test
+def find_include_file(filename, include_dir, quiet=False):
+    """
+    Returns: The resolved path of filename in the first include directory that has it
+    Returns: None if it is not found
+    """
+    found = SESSION_RESOLVER.find_resolved(filename, include_dir)
+    if found is not None:
+        return found
 
-    print(f"Warning: Could not find included file '{filename}' in any include directory.", file=sys.stderr) 
+    if not quiet:
+        print(f"Warning: Could not find included file '{filename}' in any include directory.", file=sys.stderr) 
     return None
 
 def extract_included_modules(file_content: str) -> Optional[List[str]]:
@@ -159,30 +273,60 @@ def extract_included_modules(file_content: str) -> Optional[List[str]]:
     Returns: Empty List if `ece2300-lint off` is found
     Returns: None if no special comment is found
     """
-        
-    # # # Remove tha labN tags before an import
-    # include_pattern = re.compile(r'include\s+"lab\d+/(.*?)"')  
-    # file_content = include_pattern.sub(r'include "\1"', file_content)
-
-    # Look for ece2300-lint off comment (returns empty list)
-    off_pattern = re.compile(r"//\s*ece2300-lint\s+off", re.IGNORECASE)
-    if off_pattern.search(file_content):
-        return []
-    
-    # Look for ece2300-lint comment followed by include line
-    lint_pattern = re.compile(r"//\s*ece2300-lint\s*\n\s*`include\s+\"([^\"]+)\"", re.IGNORECASE)
-    lint_match = lint_pattern.search(file_content)
-    
-    if lint_match:
-        module_name = lint_match.group(1)
-        return [module_name]
-    
-    # If neither comment is present, return None
-    return None
+    return scan_source(file_content).lint_modules
 
 def extract_all_includes(file_content: str) -> List[str]:
-    """Finds all `include` statements in a file's content."""
-    return re.findall(r'`include\s+"([^"]+)"', file_content)
+    """Finds all `include statements in a file's code (not in comments or strings)."""
+    return scan_source(file_content).includes
+
+def source_closure(initial_file: Path, include_dir) -> Tuple[List[Path], Set[str]]:
+    """
+    Lists every file a lint run of initial_file depends on, without processing them:
+    the file itself, the file its special comment points at (if any) and everything
+    that file includes. Files that cannot be read are skipped silently, the names of
+    files that cannot be found are returned so creating one later can be noticed.
+
+    Returns: (resolved paths of the files, names that were not found in include_dir)
+    """
+    initial_file = Path(initial_file).resolve()
+    closure = [initial_file]
+    missing: Set[str] = set()
+    try:
+        content = initial_file.read_text(encoding='utf-8')
+    except IOError:
+        return closure, missing
+
+    start = [initial_file]
+    input_file = extract_included_modules(content)
+    if input_file:
+        start = []
+        for name in input_file:
+            found = find_include_file(name, include_dir, quiet=True)
+            if found:
+                start.append(found)
+            else:
+                missing.add(name)
+    elif input_file is not None:
+        return closure, missing
+
+    files_to_process_q = deque(start)
+    visited_paths: Set[Path] = set(closure) | set(start)
+    closure.extend(path for path in start if path != initial_file)
+    while files_to_process_q:
+        current_path = files_to_process_q.popleft()
+        try:
+            content = current_path.read_text(encoding='utf-8')
+        except IOError:
+            continue
+        for include_name in extract_all_includes(content):
+            found_path = find_include_file(include_name, include_dir, quiet=True)
+            if found_path is None:
+                missing.add(include_name)
+            elif found_path not in visited_paths:
+                visited_paths.add(found_path)
+                closure.append(found_path)
+                files_to_process_q.append(found_path)
+    return closure, missing
 
 def preprocess_unparsable_file(content: str) -> str:
     """
@@ -200,53 +344,52 @@ def preprocess_unparsable_file(content: str) -> str:
     processed_content = module_pattern.sub(replace_body, content)
     return processed_content    
 
+# Synthesis attributes pyverilog cannot parse
+KEEP_ATTRIBUTE_PATTERN = re.compile(r"\(\*\s*keep\s*=\s*1\s*\*\)")
+
+# Remove specific macros
+ECE2300_MACRO_PATTERN = re.compile(
+    r'^\s*`ECE2300_(?:UNUSED|UNDRIVEN)\s*\([^)]*\)\s*;\s*(?:\/\/.*)?$',
+    re.MULTILINE
+)
+
+# Turn any include filtpath to just an include module
+# `include "lab3/foo/bar/baz.v"   ->  `include "baz.v"    
+INCLUDE_PATH_PATTERN = re.compile(r'`include\s+"(?:[^"\n]*/)?([^/"]+)"')
+
+# Remove the ECE2300 Macro
+ECE2300_XPROP_PATTERN = re.compile(
+    r'^\s*`ECE2300(?:_SEQ)?(?:_XPROP)?\d*\s*'   # macro name
+    r'\(\s*[^,]+,\s*.+?\)\s*;'                  # 2 arguments inside (...)
+    r'\s*(?:\/\/.*)?$',                         # optional trailing comment
+    re.MULTILINE
+)
+
+def clean_content(original_content: str, cannot_parse: bool = False) -> str:
+    """
+    Removes the constructs pyverilog cannot handle from a file's content.
+    If the cannot_parse flag is set, it also removes the entire body of the module
+    """
+    cleaned_content = scan_source(original_content).cleaned
+    if cannot_parse:
+        cleaned_content = preprocess_unparsable_file(cleaned_content)
+    return cleaned_content
+
 def clean_and_save_file(source_path: Path, build_dir: Path, cannot_parse: bool = False) -> Optional[Tuple[Path, str]]:
     """
     Cleans a file, saves it, and returns the destination path and cleaned content.
     If the can_parse flag is set, it preprocesses the file by removing the entire body of the module
     """
-
-    pattern_to_remove = re.compile(r"\(\*\s*keep\s*=\s*1\s*\*\)")
-    # Remove specific macros
-    ece2300_macro_pattern = re.compile(
-        r'^\s*`ECE2300_(?:UNUSED|UNDRIVEN)\s*\([^)]*\)\s*;\s*(?:\/\/.*)?$',
-        re.MULTILINE
-    )
-    # Turn any include filtpath to just an include module
-    # `include "lab3/foo/bar/baz.v"   ->  `include "baz.v"    
-    include_pattern = re.compile(r'`include\s+"(?:.*/)?([^/"]+)"')
-
-    # Remove the ECE2300 Macro
-    ece2300_xprop_pattern = re.compile(
-        r'^\s*`ECE2300(?:_SEQ)?(?:_XPROP)?\d*\s*'   # macro name
-        r'\(\s*[^,]+,\s*.+?\)\s*;'                  # 2 arguments inside (...)
-        r'\s*(?:\/\/.*)?$',                         # optional trailing comment
-        re.MULTILINE
-    )
-
     dest_path = build_dir /  source_path.name
     try:
         original_content = source_path.read_text(encoding='utf-8')
-        cleaned_content = pattern_to_remove.sub('', original_content)
-        cleaned_content = ece2300_macro_pattern.sub('', cleaned_content)
-        cleaned_content = ece2300_xprop_pattern.sub('', cleaned_content)
-
-        # Change the import statements from labN/module to just module
-        cleaned_content = include_pattern.sub(r'`include "\1"', cleaned_content)
-
-        if cannot_parse:
-            cleaned_content = preprocess_unparsable_file(cleaned_content)
-        
+        cleaned_content = clean_content(original_content, cannot_parse)
         dest_path.write_text(cleaned_content, encoding='utf-8')
         return dest_path, cleaned_content
     except IOError as e:
         print(f"Error processing file {source_path}: {e}", file=sys.stderr)
         return None
 
-MODULE_BLOCK_REGEX = re.compile(
-    r'\bmodule\s+([a-zA-Z_]\w*)\b(.*?)\bendmodule\b',
-    flags=re.DOTALL
-)
 XPROP_MACRO_REGEX = re.compile(
     r"`ECE2300(?:_XPROP)?\d*\s*\(\s*([^,]+)\s*,\s*(?:[^)]+)\s*\)"
 )
@@ -256,45 +399,411 @@ SEQ_XPROP_MACRO_REGEX = re.compile(
 
 def extract_module_xprop_signals_from_file(file_content):
     """
-    Parses a file's content by finding module blocks and extracts XPROP signals from each.
+    Finds the XPROP signals of every module block in a file's content.
     
     Returns:
-        A dictionary mapping each found module name to its list of XPROP signals.
+        Two dictionaries mapping each found module name to its list of XPROP
+        (and SEQ_XPROP) signals.
     """
-    comb_results: Dict[str, List[str]] = {}
-    seq_results: Dict[str, List[str]] = {}
+    scan = scan_source(file_content)
+    return scan.comb_xprop, scan.seq_xprop
+
+#--------------------------------------
+# Source scanner
+#--------------------------------------
+
+# Where the source scanner stops: comments and strings, the directives cleaning
+# removes or rewrites, synthesis attributes and module boundaries. Everything in
+# between is plain code and copied in one piece. The lookahead lets the regex
+# engine skip the positions none of them can start at.
+SOURCE_TOKEN_PATTERN = re.compile(
+    r'(?=[/"`(em])(?:'
+    f"(?P<skip>{COMMENT_OR_STRING_PATTERN.pattern})"
+    r'|(?P<include>`include\b)'
+    r'|(?P<macro>`ECE2300)'
+    r'|(?P<attribute>\(\*)'
+    r'|\b(?P<keyword>module|endmodule)\b'
+    r')'
+)
 
-    # Pre-process to remove comments
-    content_no_comments = preprocess_code(file_content)
-    
-    # Use finditer to find all module ... endmodule blocks
-    for match in MODULE_BLOCK_REGEX.finditer(content_no_comments):
+# The macro lines cleaning removes, from the backtick on. Cleaning drops keep
+# attributes first, so they may follow the macro on its line.
+MACRO_LINE_PATTERNS = [re.compile(pattern.pattern.replace(r'^\s*', '', 1)
+                                  .replace(r'\s*(?:\/\/.*)?$', rf'(?:\s|{KEEP_ATTRIBUTE_PATTERN.pattern})*(?:\/\/.*)?$'),
+                                  re.MULTILINE)
+                       for pattern in (ECE2300_MACRO_PATTERN, ECE2300_XPROP_PATTERN)]
+WHITESPACE_PATTERN = re.compile(r'\s*')
+LINE_COMMENT_PATTERN = re.compile(r'//[^\n]*')
+
+# The special comments, only looked for in comments that mention ece2300-lint
+LINT_MARKER_HINT = re.compile(r"ece2300-lint", re.IGNORECASE)
+LINT_OFF_PATTERN = re.compile(r"//\s*ece2300-lint\s+off", re.IGNORECASE)
+LINT_MODULE_PATTERN = re.compile(r"//\s*ece2300-lint\s*\n\s*`include\s+\"([^\"]+)\"", re.IGNORECASE)
+
+INCLUDE_NAME_PATTERN = re.compile(r'`include\s+"([^"]+)"')
+MODULE_HEADER_PATTERN = re.compile(r'module\s+([a-zA-Z_]\w*)\b')
+
+class SourceScan(NamedTuple):
+    """Everything the preprocessor needs from one file, see scan_source."""
+    # Modules named by the special comment, as returned by extract_included_modules
+    lint_modules: Optional[List[str]]
+    # Names of the files included by the code, in order
+    includes: List[str]
+    # Key: module, Value: first arguments of its ECE2300_XPROP (ECE2300_SEQ_XPROP) macros
+    comb_xprop: Dict[str, List[str]]
+    seq_xprop: Dict[str, List[str]]
+    # The content without the constructs pyverilog cannot handle
+    cleaned: str
+    # The cleaned content without comments and with blanked out strings, as preprocess_code returns it
+    code: str
+
+class _CleanedText:
+    """The cleaned content and its code only copy, built up piece by piece."""
+    def __init__(self):
+        self.pieces: List[str] = []
+        self.code_pieces: List[str] = []
+        self.length = 0
 
-        # group(1) is the module name from our regex: ([a-zA-Z_]\w*)
-        module_name = match.group(1)
-        
-        # The entire matched text (the module block)
-        module_body = match.group(2)
-        
-        # Now, find all XPROP signals within this specific module's body
-        comb_signals = XPROP_MACRO_REGEX.findall(module_body)
+    def add(self, text: str, code: Optional[str] = None) -> None:
+        """Appends text to the cleaned content and code (text itself if None) to the code only copy."""
+        self.pieces.append(text)
+        self.code_pieces.append(text if code is None else code)
+        self.length += len(text)
 
-        # Find all the Sequential XPROP signals
-        seq_signals = SEQ_XPROP_MACRO_REGEX.findall(module_body)
+    def line_start(self) -> Optional[int]:
+        """
+        Returns: The first position that starts a line and is only followed by
+                 whitespace, which is where `^\s*` matches up to the end
+        Returns: None if there is no such position
+        """
+        found = None
+        pos = self.length
+        for piece in reversed(self.pieces):
+            for char in reversed(piece):
+                if char == '\n':
+                    found = pos
+                if not char.isspace():
+                    return found
+                pos -= 1
+        return 0
+
+    def pop(self, position: int) -> str:
+        """
+        Removes everything after position, which is whitespace and so the same in both copies.
+        Returns: The removed text
+        """
+        removed = []
+        for pieces in (self.code_pieces, self.pieces):
+            removed = []
+            excess = self.length - position
+            while excess:
+                piece = pieces.pop()
+                if len(piece) > excess:
+                    pieces.append(piece[:-excess])
+                    piece = piece[-excess:]
+                removed.append(piece)
+                excess -= len(piece)
+        self.length = position
+        return ''.join(reversed(removed))
+
+class _SourceScanner:
+    """The state of one scan_source call."""
+    def __init__(self, content: str):
+        self.content = content
+        self.out = _CleanedText()
+        self.lint_off = False
+        self.lint_module = None
+        self.includes: List[str] = []
+        self.comb_xprop: Dict[str, List[str]] = {}
+        self.seq_xprop: Dict[str, List[str]] = {}
+        # Module being scanned and its xprop signals, which only count once its endmodule is found
+        self.module_name = None
+        self.module_comb: List[str] = []
+        self.module_seq: List[str] = []
+
+    def scan(self) -> SourceScan:
+        content, out = self.content, self.out
+        search = SOURCE_TOKEN_PATTERN.search
+        pos = 0
+        while True:
+            token = search(content, pos)
+            if token is None:
+                break
+            start = token.start()
+            if start > pos:
+                out.add(content[pos:start])
+            pos = token.end()
+
+            if token.group('skip') is not None:
+                text = token.group()
+                if text[0] == '/':
+                    self._find_markers(start, pos)
+                out.add(text, _strip_comment_or_string(token))
+
+            elif token.group('include') is not None:
+                name = INCLUDE_NAME_PATTERN.match(content, start)
+                if name:
+                    self.includes.append(name.group(1))
+                # Change the include from labN/module to just module
+                path = INCLUDE_PATH_PATTERN.match(content, start)
+                if path:
+                    text = f'`include "{path.group(1)}"'
+                    out.add(text, COMMENT_OR_STRING_PATTERN.sub(_strip_comment_or_string, text))
+                    pos = path.end()
+                else:
+                    out.add(token.group())
 
-        if comb_signals:
-            if module_name not in comb_results:
-                comb_results[module_name] = []
-            comb_results[module_name].extend(comb_signals)
-        
-        if seq_signals:
-            if module_name not in seq_results:
-                seq_results[module_name] = []
-            seq_results[module_name].extend(seq_signals)
-            
-    return comb_results, seq_results
-
-def main(args_list=None) -> Tuple[List[str], Dict[str, List[str]]]:
+            elif token.group('macro') is not None:
+                pos = self._macro(token)
+
+            elif token.group('attribute') is not None:
+                keep = KEEP_ATTRIBUTE_PATTERN.match(content, start)
+                if keep:
+                    pos = keep.end()
+                else:
+                    out.add('(')
+                    pos = start + 1
+
+            else:
+                self._module_boundary(token)
+                out.add(token.group())
+
+        out.add(content[pos:])
+        lint_modules = [] if self.lint_off else [self.lint_module] if self.lint_module else None
+        return SourceScan(lint_modules, self.includes, self.comb_xprop, self.seq_xprop,
+                          ''.join(out.pieces), ''.join(out.code_pieces))
+
+    def _find_markers(self, start: int, end: int) -> None:
+        """Looks for the special comments starting between start and end."""
+        content = self.content
+        if not LINT_MARKER_HINT.search(content, start, end):
+            return
+        off = LINT_OFF_PATTERN.search(content, start)
+        if off and off.start() < end:
+            self.lint_off = True
+        marker = LINT_MODULE_PATTERN.search(content, start)
+        if self.lint_module is None and marker and marker.start() < end:
+            self.lint_module = marker.group(1)
+
+    def _module_boundary(self, token) -> None:
+        """Starts the module of a module keyword, or records the xprop signals of the module an endmodule ends."""
+        if token.group('keyword') == 'module':
+            header = MODULE_HEADER_PATTERN.match(self.content, token.start())
+            if self.module_name is None and header:
+                self.module_name, self.module_comb, self.module_seq = header.group(1), [], []
+        elif self.module_name is not None:
+            if self.module_comb:
+                self.comb_xprop.setdefault(self.module_name, []).extend(self.module_comb)
+            if self.module_seq:
+                self.seq_xprop.setdefault(self.module_name, []).extend(self.module_seq)
+            self.module_name = None
+
+    def _macro_signals(self, start: int) -> None:
+        """Records the first argument of the xprop macro at start for the current module."""
+        if self.module_name is not None:
+            comb = XPROP_MACRO_REGEX.match(self.content, start)
+            if comb:
+                self.module_comb.append(comb.group(1))
+            seq = SEQ_XPROP_MACRO_REGEX.match(self.content, start)
+            if seq:
+                self.module_seq.append(seq.group(1))
+
+    def _macro(self, token) -> int:
+        """
+        Handles an ECE2300 macro. A macro on a line of its own is removed, and so is the
+        whitespace around it. Together with the macro lines, line comments and keep
+        attributes right after it, it is cleaned with the clean_content patterns, so
+        the result is exactly what applying them to the whole file gives. Includes,
+        macros and module boundaries on the removed lines are still recorded.
+
+        Returns: Where scanning continues
+        """
+        content, out, start = self.content, self.out, token.start()
+        line_start = out.line_start()
+        if line_start is None or not any(pattern.match(content, start) for pattern in MACRO_LINE_PATTERNS):
+            self._macro_signals(start)
+            out.add(token.group())
+            return token.end()
+
+        # Everything up to the last line break before the next other code
+        end = start
+        while True:
+            next_pos = WHITESPACE_PATTERN.match(content, end).end()
+            item = None
+            for pattern in (*MACRO_LINE_PATTERNS, LINE_COMMENT_PATTERN, KEEP_ATTRIBUTE_PATTERN):
+                item = pattern.match(content, next_pos)
+                if item:
+                    break
+            if item is None:
+                break
+            end = item.end()
+        stop = len(content) if next_pos == len(content) else content.rfind('\n', start, next_pos)
+
+        self._find_markers(start, stop)
+        # The patterns can run over other code on the same line (another macro's arguments
+        # may hide an include or an endmodule), which is removed but still counts
+        for item in SOURCE_TOKEN_PATTERN.finditer(content, start, stop):
+            if item.group('include') is not None:
+                name = INCLUDE_NAME_PATTERN.match(content, item.start())
+                if name:
+                    self.includes.append(name.group(1))
+            elif item.group('macro') is not None:
+                self._macro_signals(item.start())
+            elif item.group('keyword') is not None:
+                self._module_boundary(item)
+
+        lines = out.pop(line_start) + KEEP_ATTRIBUTE_PATTERN.sub('', content[start:stop])
+        lines = ECE2300_XPROP_PATTERN.sub('', ECE2300_MACRO_PATTERN.sub('', lines))
+        out.add(lines, COMMENT_OR_STRING_PATTERN.sub(_strip_comment_or_string, lines))
+        return stop
+
+@lru_cache(maxsize=256)
+def scan_source(content: str) -> SourceScan:
+    """
+    Tokenizes a file's content once and collects everything the preprocessor needs
+    from it: the special comment, the includes, the xprop macros of every module,
+    the cleaned content and the cleaned content without comments and strings (for
+    the construct checker).
+
+    Only code counts: includes, macros and module boundaries in comments or strings
+    are ignored. Memoized on the content since the same file is looked at by several steps.
+    """
+    return _SourceScanner(content).scan()
+
+#--------------------------------------
+# Project-wide include graph
+#--------------------------------------
+
+class IncludeGraph:
+    """
+    Include graph shared by every test bench preprocessed in one session (one
+    `ece2300-lint` run over many files, or a long running lint server).
+
+    Dependencies such as ece2300-misc.v and ece2300-test.v are included by every
+    test bench. Each file is read, cleaned, checked and scanned for xprop macros
+    once, and only redone when its modification time or size changes. The cleaned
+    content is handed to the linter in memory; when a build directory is used
+    instead, each cleaned copy is written to it at most once.
+    """
+    def __init__(self):
+        self.checker = VerilogChecker()
+        # Key: resolved source path, Value: (stamp, content, cleaned content, comb xprop, seq xprop, errors, include names)
+        self._files: Dict[Path, Tuple] = {}
+        # Key: (build dir, basename), Value: (resolved source path, stamp) of the cleaned copy written there
+        self._published: Dict[Tuple[Path, str], Tuple[Path, Tuple[int, int]]] = {}
+
+    def analyze(self, source_path: Path) -> Optional[Tuple]:
+        """
+        Runs every per-file preprocessing step on a file.
+
+        Returns: (stamp, content, cleaned content, comb xprop dict, seq xprop dict, construct errors, include names)
+        Returns: None if the file could not be read
+        """
+        try:
+            stat = source_path.stat()
+        except OSError as e:
+            print(f"Error reading file {source_path}: {e}", file=sys.stderr)
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._files.get(source_path)
+        if cached is not None and cached[0] == stamp:
+            return cached
+
+        try:
+            with TIMINGS.stage("io"):
+                content = source_path.read_text(encoding='utf-8')
+        except IOError as e:
+            print(f"Error reading file {source_path}: {e}", file=sys.stderr)
+            return None
+
+        # Get the xprop, the includes and the cleaned content of the current file
+        with TIMINGS.stage("scan"):
+            scan = scan_source(content)
+
+        # We never check for comments again because this shouldnt happen
+        # The only module that should have comments is the test files and 
+        # test files should not reference each other so we can safely ignore them
+        # We are assuming these modules are normal and can be parsed
+
+        # Check if this file contains Any Unparsable modules
+        current_file_has_tinyRV1 = 'tinyrv1' in os.path.basename(source_path)
+        current_file_has_ProcScycleCtrl = 'ProcScycleCtrl' in os.path.basename(source_path)
+        current_file_has_ProcSimpleCtrl = 'ProcSimpleCtrl' in os.path.basename(source_path)
+
+        can_parse = current_file_has_tinyRV1 or current_file_has_ProcScycleCtrl or current_file_has_ProcSimpleCtrl
+
+        cleaned_content = scan.cleaned
+        if can_parse:
+            with TIMINGS.stage("clean"):
+                cleaned_content = preprocess_unparsable_file(cleaned_content)
+
+        # Check the cleaned content (skip checking for Non parsable files since content was removed)
+        errors = []
+        if not can_parse:
+            errors = self.checker.check_code(scan.code, str(source_path))
+
+        cached = (stamp, content, cleaned_content, scan.comb_xprop, scan.seq_xprop, errors, scan.includes)
+        self._files[source_path] = cached
+        return cached
+
+    def closure(self, start: Path, include_dir, quiet: bool = False) -> List[Path]:
+        """
+        Returns start and every file it includes, directly or indirectly, in breadth first order.
+        Files that cannot be read are listed but not followed.
+        """
+        closure = [start]
+        files_to_process_q = deque([start])
+        visited_paths: Set[Path] = {start}
+        while files_to_process_q:
+            current_path = files_to_process_q.popleft()
+            analysis = self.analyze(current_path)
+            if analysis is None:
+                continue
+            # Add newly found dependencies to the queue if they haven't been seen
+            for include_name in analysis[6]:
+                with TIMINGS.stage("include_bfs"):
+                    found_path = find_include_file(include_name, include_dir, quiet=quiet)
+                if found_path and found_path not in visited_paths:
+                    visited_paths.add(found_path)
+                    closure.append(found_path)
+                    files_to_process_q.append(found_path)
+        return closure
+
+    def publish(self, source_path: Path, build_dir: Path) -> Optional[Path]:
+        """
+        Saves the cleaned copy of a file to build_dir unless the same version is already there.
+
+        Returns: The destination path
+        Returns: None if the file could not be read or saved
+        """
+        analysis = self.analyze(source_path)
+        if analysis is None:
+            return None
+        dest_path = build_dir / source_path.name
+        key = (build_dir, source_path.name)
+        if self._published.get(key) == (source_path, analysis[0]) and dest_path.is_file():
+            return dest_path
+        try:
+            with TIMINGS.stage("io"):
+                dest_path.write_text(analysis[2], encoding='utf-8')
+        except IOError as e:
+            print(f"Error processing file {source_path}: {e}", file=sys.stderr)
+            return None
+        self._published[key] = (source_path, analysis[0])
+        return dest_path
+
+# Graph used when the caller does not provide one. A long running lint server
+# keeps it for its whole lifetime, so unchanged dependencies are never reprocessed.
+SESSION_GRAPH = IncludeGraph()
+
+def main(args_list=None, graph: Optional[IncludeGraph] = None, sources: Optional[Dict[str, str]] = None) -> Tuple[List[str], Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Cleans and checks a file and everything it includes, saving the cleaned copies to the temp dir.
+    graph: The include graph to share the per-file work with (defaults to SESSION_GRAPH)
+    sources: If a dictionary is given, the cleaned copies are added to it (keyed by file
+             name) instead of being saved, and file names are returned instead of paths
+    """
     parser = argparse.ArgumentParser(description='Recursively clean and check Verilog files and their dependencies.')
     parser.add_argument('file', help='The top-level Verilog file or include list to start processing.')
     parser.add_argument('-I', '--include-dir', action='append', default=[],
@@ -315,7 +824,8 @@ def main(args_list=None) -> Tuple[List[str], Dict[str, List[str]]]:
         sys.exit(1)
 
     temp_dir = Path(args.temp_dir)
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    if sources is None:
+        temp_dir.mkdir(parents=True, exist_ok=True)
 
     #--------------------------------------
     # Get top level files
@@ -334,7 +844,7 @@ def main(args_list=None) -> Tuple[List[str], Dict[str, List[str]]]:
             top_level.add((basename, file_path))
     elif input_file is not None:
         # Exit here no linting will be done
-        return ([], {})
+        return ([], {}, {})
     else:
         # If no special comment is found, just add the initial file
         top_level.add((os.path.basename(initial_file), initial_file))
@@ -349,9 +859,8 @@ def main(args_list=None) -> Tuple[List[str], Dict[str, List[str]]]:
     for item in top_level:
         path = find_include_file(item[1], args.include_dir)
     
-    # Creates datastructures for processing
-    files_to_process_q = deque([path])
-    visited_paths: Set[Path] = {path}
+    if graph is None:
+        graph = SESSION_GRAPH
     all_errors: Dict[str, List[Dict]] = {}
 
     # This will hold the final paths of the cleaned files in the temporary directory
@@ -359,19 +868,19 @@ def main(args_list=None) -> Tuple[List[str], Dict[str, List[str]]]:
     # This will hold all the xprop signals found in the modules
     module_to_xprop_signals: Dict[str, List[str]] = {} 
     module_to_xprop_seq_signals : Dict[str, List[str]] = {}
-    checker = VerilogChecker()
     
-    while files_to_process_q:
-        current_path = files_to_process_q.popleft()
-        
-        try:
-            content = current_path.read_text(encoding='utf-8')
-        except IOError as e:
-            print(f"Error reading file {current_path}: {e}", file=sys.stderr)
-            continue # Skip to the next file in the queue
-        
-        # Get the xprop for the current file
-        comb_signals_in_file, seq_signals_in_file = extract_module_xprop_signals_from_file(content)
+    for current_path in graph.closure(path, args.include_dir):
+        if sources is not None:
+            analysis = graph.analyze(current_path)
+            if analysis is None:
+                continue # Error during read/clean
+            dest_path = current_path.name
+            sources[dest_path] = analysis[2]
+        else:
+            dest_path = graph.publish(current_path, temp_dir)
+            if dest_path is None:
+                continue # Error during read/clean/save
+        _, _, _, comb_signals_in_file, seq_signals_in_file, errors, _ = graph.analyze(current_path)
 
         # Add to comb dictonary
         if comb_signals_in_file:
@@ -386,41 +895,10 @@ def main(args_list=None) -> Tuple[List[str], Dict[str, List[str]]]:
                 if module not in module_to_xprop_seq_signals:
                     module_to_xprop_seq_signals[module] = []
                 module_to_xprop_seq_signals[module].extend(signals)
-        
-        # We never check for comments again because this shouldnt happen
-        # The only module that should have comments is the test files and 
-        # test files should not reference each other so we can safely ignore them
-        # We are assuming these modules are normal and can be parsed
 
-        # Check if this file contains Any Unparsable modules
-        current_file_has_tinyRV1 = 'tinyrv1' in os.path.basename(current_path)
-        current_file_has_ProcScycleCtrl = 'ProcScycleCtrl' in os.path.basename(current_path)
-        current_file_has_ProcSimpleCtrl = 'ProcSimpleCtrl' in os.path.basename(current_path)
-
-        can_parse = current_file_has_tinyRV1 or current_file_has_ProcScycleCtrl or current_file_has_ProcSimpleCtrl
-
-        result = clean_and_save_file(current_path, temp_dir, cannot_parse=can_parse)
-        if not result:
-            continue # Error during clean/save
-
-        dest_path, cleaned_content = result
         final_build_paths.append(str(dest_path))
-        
-        # Check the cleaned content (skip checking for Non parsable files since content was removed)
-        if not can_parse:
-            errors = checker.check_content(cleaned_content, str(current_path))
-            if errors:
-                all_errors[str(current_path)] = errors
-        
-        # Find its dependencies for further processing
-        includes_to_add = extract_all_includes(content)
-
-        # Add newly found dependencies to the queue if they haven't been seen
-        for include_name in includes_to_add:
-            found_path = find_include_file(include_name, args.include_dir)
-            if found_path and found_path not in visited_paths:
-                visited_paths.add(found_path)
-                files_to_process_q.append(found_path)
+        if errors:
+            all_errors[str(current_path)] = errors
 
     # --- Final Reporting ---
     total_errors = sum(len(errs) for errs in all_errors.values())
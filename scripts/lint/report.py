@@ -0,0 +1,123 @@
+"""
+ECE2300 Lint Report
+The results of a lint run and how they are printed. Kept apart from the linter
+so that printing cached results does not need to import Pyverilog.
+"""
+
+import sys
+from typing import NamedTuple, Optional
+
+class Violation(NamedTuple):
+    """
+    One reported violation. The first four fields identify it: a violation with the
+    same module, rule, message and line as an earlier one is a duplicate.
+    """
+    module: Optional[str]
+    rule: str
+    message: str
+    lineno: int
+    # Rule ID (e.g. R101), the file being linted and the column (Pyverilog does not record columns)
+    rule_id: Optional[str] = None
+    file: Optional[str] = None
+    column: Optional[int] = None
+
+    @property
+    def key(self):
+        return self[:4]
+
+class Report:
+    """
+    Result of linting a list of files, in the order the files were given.
+
+    entries: List of (file, violations, error message, traceback text). For a file that
+             was linted the error and traceback are None; for a file that could not be
+             linted the violations are None.
+    """
+    def __init__(self):
+        self.entries = []
+
+    @property
+    def files(self):
+        """List of (file, violations) for every file that was parsed and linted."""
+        return [(f_path, violations) for f_path, violations, error, _ in self.entries if error is None]
+
+    @property
+    def errors(self):
+        """List of (file, error message) for every file that could not be linted."""
+        return [(f_path, error) for f_path, _, error, _ in self.entries if error is not None]
+
+    @property
+    def total(self):
+        """Number of violations plus the number of files that could not be linted."""
+        return sum(len(violations) if error is None else 1 for _, violations, error, _ in self.entries)
+
+def print_report(report):
+    """
+    Prints a Report the way the command line linter always has: the violations of each
+    file, or its error and traceback on stderr.
+
+    Returns: The total number of violations and errors
+    """
+    for _, violations, error, traceback_text in report.entries:
+        if error is not None:
+            print(error, file=sys.stderr)
+            if traceback_text:
+                sys.stderr.write(traceback_text)
+        elif violations:
+            print_violations(violations)
+    return report.total
+
+def print_violations(violations):
+    """Prints the violations found in one file, sorted by module, line and rule."""
+    print(f"Found {len(violations)} violation(s):")
+
+    sorted_violations = sorted(violations, key=lambda x: (x[0] or "", x[3], x[1]))
+    for mod_name, rule_id, msg, lineno in (v[:4] for v in sorted_violations):
+        module_prefix = f"Module '{mod_name}'" if mod_name else ""
+        print(f"  - {module_prefix}: [{rule_id}] {msg}")
+
+def finish(total_violations_across_files):
+    """
+    Prints the final summary and exits with an error if anything was found.
+    Returns: 0 if nothing was found
+    """
+    if total_violations_across_files > 0:
+        print(f"\nLinting finished with {total_violations_across_files} total violation(s)/error(s).")
+        sys.exit(1)
+    else:
+        return 0
+
+class StderrRecorder:
+    """
+    Stands in for sys.stderr, passing everything through while keeping a copy,
+    so the warnings printed during a run can be replayed with its results.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @property
+    def text(self) -> str:
+        """Everything written so far"""
+        return "".join(self._parts)
+
+def replay_results(results, warnings=""):
+    """
+    Reports results returned by an earlier call to main exactly as main reported them.
+
+    results: A list of (file, violations) tuples
+    warnings: What the run printed to stderr before reporting (see StderrRecorder)
+    """
+    if warnings:
+        sys.stderr.write(warnings)
+        sys.stderr.flush()
+    report = Report()
+    report.entries = [(f_path, violations, None, None) for f_path, violations in results]
+    finish(print_report(report))
@@ -0,0 +1,97 @@
+"""
+ECE2300 Include Resolver
+Finds the files named by `include lines in the include directories.
+
+Each directory is listed once and every lookup is remembered. Resolving the
+includes of many files then costs a few directory reads, not a stat (and a
+realpath) per include per include directory. This matters on network file
+systems, where the ece2300/*.v include chains of every test bench otherwise
+stat the same paths over and over.
+
+The resolver is shared by the preprocessor and mk-verilog-deps, so it only uses
+the standard library. It assumes directories do not change while it is in use.
+Long running processes (the lint server, watch mode) call clear() before each
+request.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+class IncludeResolver:
+    """
+    Memoized lookup of include names in a list of include directories.
+    The first directory that has the name wins, like the Verilog preprocessor.
+    """
+    def __init__(self):
+        # Key: directory, Value: dictionary of entry name to True for files, False for anything else
+        self._listings: Dict[str, Dict[str, bool]] = {}
+        # Key: (include name, include directories, files only), Value: path found or None
+        self._found: Dict[Tuple[str, Tuple[str, ...], bool], Optional[str]] = {}
+        # Key: path found, Value: resolved path
+        self._resolved: Dict[str, Path] = {}
+
+    def clear(self) -> None:
+        """Forgets every directory listing and lookup, so changes on disk are seen again."""
+        self._listings.clear()
+        self._found.clear()
+        self._resolved.clear()
+
+    def _listing(self, directory: str) -> Dict[str, bool]:
+        listing = self._listings.get(directory)
+        if listing is None:
+            listing = {}
+            try:
+                with os.scandir(directory or ".") as it:
+                    for entry in it:
+                        try:
+                            listing[entry.name] = entry.is_file()
+                        except OSError:
+                            listing[entry.name] = False
+            except OSError:
+                pass # Missing or unreadable directories have no entries
+            self._listings[directory] = listing
+        return listing
+
+    def _lookup(self, directory: str, name: str) -> Optional[bool]:
+        """Returns: True if directory/name is a file, False if it is something else, None if it does not exist"""
+        # Names such as ece2300/ece2300-misc.v are looked up in the listing of the subdirectory
+        head, tail = os.path.split(name)
+        if not tail:
+            return None
+        return self._listing(os.path.join(directory, head) if head else directory).get(tail)
+
+    def find(self, name, include_dirs: Sequence[str], files_only: bool = True) -> Optional[str]:
+        """
+        Returns: os.path.join(directory, name) for the first include directory that has name
+        Returns: None if no include directory has it
+        files_only: Only accept files, not directories
+        """
+        name = os.fspath(name)
+        key = (name, tuple(os.fspath(directory) for directory in include_dirs), files_only)
+        try:
+            return self._found[key]
+        except KeyError:
+            pass
+
+        found = None
+        for directory in key[1]:
+            kind = self._lookup(directory, name)
+            if kind or (kind is not None and not files_only):
+                found = os.path.join(directory, name)
+                break
+        self._found[key] = found
+        return found
+
+    def find_resolved(self, name, include_dirs: Sequence[str]) -> Optional[Path]:
+        """Returns: The resolved path of the file find() returns, or None"""
+        found = self.find(name, include_dirs)
+        if found is None:
+            return None
+        resolved = self._resolved.get(found)
+        if resolved is None:
+            resolved = self._resolved[found] = Path(found).resolve()
+        return resolved
+
+# Resolver shared by everything in this process
+SESSION_RESOLVER = IncludeResolver()
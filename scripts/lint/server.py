@@ -0,0 +1,202 @@
+"""
+ECE2300 Lint Server
+Keeps a single lint process alive on a local Unix socket so that repeated
+invocations (one per test bench during `make check`) do not pay for starting
+Python, importing pyverilog, building the parser and loading the rulesets
+every time.
+
+The protocol is a single JSON object per connection in each direction:
+
+    request:  {"argv": [...], "cwd": "/path/the/client/ran/in"}
+    response: {"status": 0, "stdout": "...", "stderr": "..."}
+
+Each request is handled in a worker forked from the server, so requests from
+`make -j` run in parallel and a stalled client only holds up its own worker.
+Workers start from the warm server (Pyverilog imported, parser built) and share
+parsed modules and results through the on-disk caches.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from typing import Callable, List, Optional, Set, Tuple
+
+# Environment variable the client checks for a running server
+SOCKET_ENV_VAR = "ECE2300_LINT_SOCKET"
+
+# Seconds a worker waits for a client to send its request or take the response
+REQUEST_TIMEOUT = 60
+
+# Requests handled at the same time, more wait for a worker to finish
+MAX_WORKERS = os.cpu_count() or 1
+
+#--------------------
+# Helper functions
+#--------------------
+
+def _recv_all(conn: socket.socket) -> bytes:
+    """Reads from the connection until the peer shuts down its write side."""
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def _exit_status(code) -> int:
+    """Converts a SystemExit code into the integer status a process would return."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    return 1
+
+def run_captured(handler: Callable[[List[str]], None], argv: List[str]) -> Tuple[int, str, str]:
+    """
+    Runs a lint request in this process and captures everything it prints.
+
+    Returns: (exit status, stdout text, stderr text)
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    status = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            handler(argv)
+        except SystemExit as e:
+            status = _exit_status(e.code)
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+        except Exception as e:
+            print(f"Error: Lint server failed to process request: {e}", file=sys.stderr)
+            status = 1
+    return status, stdout.getvalue(), stderr.getvalue()
+
+#--------------------
+# Server
+#--------------------
+
+def _handle_connection(conn: socket.socket, handler: Callable[[List[str]], None], original_dir: str) -> None:
+    """Reads one request from conn, runs it and sends back the response."""
+    conn.settimeout(REQUEST_TIMEOUT)
+    try:
+        request = json.loads(_recv_all(conn).decode("utf-8"))
+        os.chdir(request.get("cwd", original_dir))
+        status, out, err = run_captured(handler, list(request["argv"]))
+    except (ValueError, KeyError, OSError) as e:
+        status, out, err = 1, "", f"Error: Malformed lint request: {e}\n"
+    finally:
+        os.chdir(original_dir)
+    response = {"status": status, "stdout": out, "stderr": err}
+    try:
+        conn.sendall(json.dumps(response).encode("utf-8"))
+    except OSError:
+        pass # Client went away, nothing to report to
+
+def _reap_workers(workers: Set[int], block: bool) -> None:
+    """Forgets the workers that finished, waiting for one first if block is set."""
+    while workers:
+        try:
+            pid, _ = os.waitpid(-1, 0 if block else os.WNOHANG)
+        except ChildProcessError:
+            workers.clear()
+            return
+        if pid == 0:
+            return
+        workers.discard(pid)
+        block = False
+
+def serve(socket_path: str, handler: Callable[[List[str]], None],
+          fingerprint: Optional[Callable[[], str]] = None) -> None:
+    """
+    Listens on `socket_path` and runs `handler(argv)` for every request, each in
+    its own forked worker (at most MAX_WORKERS at a time).
+
+    Requests run in the working directory of the client that sent them, so
+    relative paths such as `-I ..` behave exactly as they would in a normal run.
+
+    fingerprint: Returns a hash of the code the server runs. When it changes, the
+                 server starts itself again so requests never run stale code.
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    # Clean up the socket when stopped with kill as well as with Ctrl-C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"ece2300-lint: serving on {socket_path}", file=sys.stderr)
+
+    original_dir = os.getcwd()
+    started_fingerprint = fingerprint() if fingerprint is not None else None
+    workers: Set[int] = set()
+    restart = False
+    try:
+        while True:
+            conn, _ = server.accept()
+            if fingerprint is not None and fingerprint() != started_fingerprint:
+                # Closing without a response makes the client lint in-process
+                conn.close()
+                restart = True
+                break
+            _reap_workers(workers, block=len(workers) >= MAX_WORKERS)
+            pid = os.fork()
+            if pid == 0:
+                # Worker: handle this one request and exit without running the server's cleanup
+                try:
+                    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                    server.close()
+                    with conn:
+                        _handle_connection(conn, handler, original_dir)
+                finally:
+                    os._exit(0)
+            workers.add(pid)
+            conn.close()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+    if restart:
+        print("ece2300-lint: lint scripts changed, restarting the server", file=sys.stderr)
+        sys.stderr.flush()
+        os.execv(sys.executable, [sys.executable] + sys.argv)
+
+#--------------------
+# Client
+#--------------------
+
+def request(socket_path: str, argv: List[str]) -> Optional[int]:
+    """
+    Forwards a lint request to a running server and replays its output.
+
+    Returns: The exit status from the server
+    Returns: None if no server is listening, so the caller can lint in-process
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return None
+
+    with client:
+        payload = {"argv": argv, "cwd": os.getcwd()}
+        try:
+            client.sendall(json.dumps(payload).encode("utf-8"))
+            client.shutdown(socket.SHUT_WR)
+            response = json.loads(_recv_all(client).decode("utf-8"))
+        except (OSError, ValueError):
+            # The server went away (e.g. it is restarting), nothing was printed yet
+            return None
+
+    sys.stdout.write(response.get("stdout", ""))
+    sys.stderr.write(response.get("stderr", ""))
+    return response.get("status", 1)
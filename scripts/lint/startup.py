@@ -0,0 +1,85 @@
+"""
+ECE2300 Lint Startup Profiler
+Measures how long each module takes to import, for `ece2300-lint --profile-startup`.
+
+The profiler has to be installed before anything else is imported, so this
+module only uses the standard library and imports nothing heavy itself.
+"""
+
+import atexit
+import builtins
+import importlib.util
+import sys
+import time
+
+# Command line flag that turns the profiler on
+PROFILE_STARTUP_FLAG = "--profile-startup"
+
+class ImportProfiler:
+    """
+    Records the time spent in every first-time import, much like `python -X importtime`.
+    Imports are recorded in the order they finish with their nesting depth, the time
+    spent in the module itself and the time including everything it imported.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        # List of (depth, module name, self seconds, cumulative seconds)
+        self.records = []
+        # Time spent in nested imports, one entry per import in progress
+        self._children_time = []
+        self._original_import = None
+
+    def install(self) -> None:
+        """Starts recording imports and prints the report when the process exits."""
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+        atexit.register(self.report)
+
+    def uninstall(self) -> None:
+        """Stops recording imports."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = name
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            try:
+                module_name = importlib.util.resolve_name("." * level + name, package)
+            except (ImportError, ValueError):
+                pass
+        # Only the first import of a module costs anything worth reporting
+        if module_name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        self._children_time.append(0.0)
+        started = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._children_time.pop()
+            self.records.append((len(self._children_time), module_name, elapsed - children, elapsed))
+            if self._children_time:
+                self._children_time[-1] += elapsed
+
+    def report(self) -> None:
+        """Prints every recorded import and the slowest ones to stderr."""
+        self.uninstall()
+        print("Startup profile (import times in ms):", file=sys.stderr)
+        print(f"{'self':>9} | {'cumulative':>10} | module", file=sys.stderr)
+        for depth, name, self_time, cumulative in self.records:
+            print(f"{self_time * 1000:9.1f} | {cumulative * 1000:10.1f} | {'  ' * depth}{name}", file=sys.stderr)
+
+        top_level = sum(cumulative for depth, _, _, cumulative in self.records if depth == 0)
+        print(f"Total import time: {top_level * 1000:.1f} ms, "
+              f"total run time: {(time.perf_counter() - self.start) * 1000:.1f} ms", file=sys.stderr)
+        slowest = sorted(self.records, key=lambda r: r[2], reverse=True)[:5]
+        if slowest:
+            print("Slowest modules: " + ", ".join(f"{name} ({self_time * 1000:.1f} ms)"
+                                                  for _, name, self_time, _ in slowest), file=sys.stderr)
+
+def profile_startup_requested(argv) -> bool:
+    """True if the profiler was asked for on the command line."""
+    return PROFILE_STARTUP_FLAG in argv
@@ -0,0 +1,205 @@
+"""
+ECE2300 Lint Timing
+Optional instrumentation that records where a lint run spends its time, for
+`ece2300-lint --timings`, `--timings-json` and `--profile`.
+
+Time is recorded per linted file and per stage of the pipeline (include
+resolution, reading files, scanning the source, construct scanning, parsing,
+visiting the AST and printing the report), and per linter visitor.
+When instrumentation is off every stage is a shared no-op context manager, so
+the normal run pays next to nothing for it.
+"""
+
+import contextlib
+import json
+import sys
+import time
+from typing import Dict, Optional
+
+# File name the stages recorded outside of any linted file are filed under
+SESSION_NAME = "<session>"
+
+class _Stage:
+    """Context manager adding the time spent inside it to one stage of the current file."""
+    __slots__ = ("timings", "name", "started")
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+_NULL_STAGE = contextlib.nullcontext()
+
+class Timings:
+    """
+    Collects stage and visitor times per file.
+
+    files: Dictionary of file name to its record,
+           {"stages": {stage: seconds}, "visitors": {visitor: [seconds, calls]}}
+    """
+    def __init__(self):
+        self.enabled = False
+        self.files: Dict[str, dict] = {}
+        self.current = SESSION_NAME
+
+    def reset(self) -> None:
+        self.files = {}
+        self.current = SESSION_NAME
+
+    def begin_file(self, name) -> None:
+        """Files the stages recorded from now on under name."""
+        self.current = str(name)
+
+    def _record(self, name) -> dict:
+        record = self.files.get(name)
+        if record is None:
+            record = self.files[name] = {"stages": {}, "visitors": {}}
+        return record
+
+    def stage(self, name):
+        """Returns: A context manager timing one stage of the current file"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def add(self, name, seconds) -> None:
+        stages = self._record(self.current)["stages"]
+        stages[name] = stages.get(name, 0.0) + seconds
+
+    def add_visitor(self, name, seconds) -> None:
+        visitors = self._record(self.current)["visitors"]
+        entry = visitors.get(name)
+        if entry is None:
+            visitors[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def take_file(self, name) -> Optional[dict]:
+        """Removes and returns the record of a file (to send it back from a worker process)."""
+        return self.files.pop(str(name), None)
+
+    def merge_file(self, name, record) -> None:
+        """Adds a record returned by take_file in another process."""
+        if not record:
+            return
+        for stage, seconds in record["stages"].items():
+            stages = self._record(str(name))["stages"]
+            stages[stage] = stages.get(stage, 0.0) + seconds
+        for visitor, (seconds, calls) in record["visitors"].items():
+            visitors = self._record(str(name))["visitors"]
+            entry = visitors.setdefault(visitor, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+
+    def totals(self):
+        """Returns: (stage name to seconds, visitor name to [seconds, calls]) summed over every file"""
+        stages, visitors = {}, {}
+        for record in self.files.values():
+            for stage, seconds in record["stages"].items():
+                stages[stage] = stages.get(stage, 0.0) + seconds
+            for visitor, (seconds, calls) in record["visitors"].items():
+                entry = visitors.setdefault(visitor, [0.0, 0])
+                entry[0] += seconds
+                entry[1] += calls
+        return stages, visitors
+
+    def trace(self, visitor_rules=None) -> dict:
+        """
+        Returns: The JSON trace of the run, every time in milliseconds
+        visitor_rules: Dictionary of visitor name to the rules it checks, included in the trace
+        """
+        def ms(seconds):
+            return round(seconds * 1000, 3)
+
+        stages, visitors = self.totals()
+        return {
+            "files": {
+                name: {
+                    "stages": {stage: ms(seconds) for stage, seconds in record["stages"].items()},
+                    "visitors": {visitor: {"ms": ms(seconds), "calls": calls}
+                                 for visitor, (seconds, calls) in record["visitors"].items()},
+                    "total_ms": ms(sum(record["stages"].values())),
+                }
+                for name, record in sorted(self.files.items())
+            },
+            "totals": {
+                "stages": {stage: ms(seconds) for stage, seconds in stages.items()},
+                "visitors": {visitor: {"ms": ms(seconds), "calls": calls,
+                                       "rules": sorted((visitor_rules or {}).get(visitor, ()))}
+                             for visitor, (seconds, calls) in visitors.items()},
+            },
+        }
+
+    def print_summary(self, visitor_rules=None, out=None, top_files=10) -> None:
+        """Prints the stage totals, the slowest files and the visitor times."""
+        out = out or sys.stderr
+        stages, visitors = self.totals()
+        total = sum(stages.values())
+        print("Lint timings (ms):", file=out)
+        for stage, seconds in sorted(stages.items(), key=lambda s: s[1], reverse=True):
+            share = 100 * seconds / total if total else 0
+            print(f"  {stage:<18} {seconds * 1000:10.1f}  {share:5.1f}%", file=out)
+        print(f"  {'total':<18} {total * 1000:10.1f}", file=out)
+
+        files = [(sum(r["stages"].values()), name) for name, r in self.files.items() if name != SESSION_NAME]
+        if files:
+            print(f"Slowest files (ms):", file=out)
+            for seconds, name in sorted(files, reverse=True)[:top_files]:
+                print(f"  {seconds * 1000:10.1f}  {name}", file=out)
+
+        if visitors:
+            print("Linter visitors and rule checks (ms, excluding nested visits):", file=out)
+            for visitor, (seconds, calls) in sorted(visitors.items(), key=lambda v: v[1][0], reverse=True):
+                rules = ", ".join(sorted((visitor_rules or {}).get(visitor, ())))
+                print(f"  {visitor:<26} {seconds * 1000:10.1f}  {calls:7d} calls  {rules}", file=out)
+
+# Timings of the current run, enabled by instrument()
+TIMINGS = Timings()
+
+@contextlib.contextmanager
+def instrument(summary: bool = False, json_path: Optional[str] = None, profile_path: Optional[str] = None,
+               visitor_rules=None):
+    """
+    Records timings (and optionally a cProfile profile) for the code run inside it.
+
+    summary: Print the timings summary to stderr at the end
+    json_path: Write the JSON trace to this file at the end
+    profile_path: Run under cProfile and dump the stats to this file (readable with pstats)
+    visitor_rules: Dictionary of visitor name to the rules it checks, for the reports
+    """
+    TIMINGS.reset()
+    TIMINGS.enabled = summary or json_path is not None
+
+    profiler = None
+    if profile_path:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield TIMINGS
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            try:
+                profiler.dump_stats(profile_path)
+            except OSError as e:
+                print(f"Warning: Could not write profile to '{profile_path}': {e}", file=sys.stderr)
+        if TIMINGS.enabled:
+            TIMINGS.enabled = False
+            rules = visitor_rules() if callable(visitor_rules) else visitor_rules
+            if summary:
+                TIMINGS.print_summary(rules)
+            if json_path is not None:
+                try:
+                    with open(json_path, "w") as f:
+                        json.dump(TIMINGS.trace(rules), f, indent=1)
+                except OSError as e:
+                    print(f"Warning: Could not write timings to '{json_path}': {e}", file=sys.stderr)
@@ -0,0 +1,305 @@
+"""
+ECE2300 Lint Watch Mode
+Relints test benches as soon as a Verilog file they depend on is saved, for
+`ece2300-lint --watch`.
+
+Every test bench is linted once at startup, which also records the files each
+one depends on (the test bench, the module its `// ece2300-lint` comment points
+at and everything that includes). When files change, only the test benches that
+depend on one of them are linted again. Includes that cannot be found yet are
+recorded by name, so creating the missing file relints the test benches too. Everything stays in memory between
+rounds: the parser, the rulesets, the preprocessed files (see IncludeGraph) and
+the parsed ASTs (see session_ast_cache), so only the changed modules are parsed.
+
+Changes are picked up with inotify on Linux and by polling elsewhere.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from lint.preprocessor import source_closure
+from lint.resolver import SESSION_RESOLVER
+
+# Extensions of the files worth relinting for
+VERILOG_SUFFIXES = (".v", ".sv")
+
+# Seconds between scans when polling
+POLL_INTERVAL = 0.5
+
+# Seconds to wait for more events after a change, so saving several files at
+# once (or an editor writing a file in steps) relints once
+DEBOUNCE = 0.05
+
+#--------------------
+# Watchers
+#--------------------
+
+def _is_verilog(path) -> bool:
+    return str(path).endswith(VERILOG_SUFFIXES)
+
+class PollingWatcher:
+    """Finds changed Verilog files by comparing their modification times and sizes."""
+    name = "polling"
+
+    def __init__(self, interval: float = POLL_INTERVAL):
+        self.interval = interval
+        self.directories: Set[Path] = set()
+        self._stamps: Dict[Path, Tuple[int, int]] = {}
+
+    def _scan(self, directories) -> Dict[Path, Tuple[int, int]]:
+        stamps = {}
+        for directory in directories:
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if _is_verilog(entry.name) and entry.is_file():
+                            stat = entry.stat()
+                            stamps[Path(entry.path).resolve()] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return stamps
+
+    def watch(self, directories: Iterable[Path]) -> None:
+        """Sets the directories to watch (not recursively)."""
+        directories = set(directories)
+        # Files in directories that were already watched keep their stamps, so
+        # changes made while the last round was linted are still noticed
+        self._stamps = {path: stamp for path, stamp in self._stamps.items() if path.parent in directories}
+        self._stamps.update(self._scan(directories - self.directories))
+        self.directories = directories
+
+    def wait(self) -> Optional[Set[Path]]:
+        """
+        Blocks until Verilog files were created, changed or deleted.
+
+        Returns: The changed files
+        """
+        while True:
+            time.sleep(self.interval)
+            stamps = self._scan(self.directories)
+            changed = {path for path in stamps.keys() | self._stamps.keys()
+                       if stamps.get(path) != self._stamps.get(path)}
+            self._stamps = stamps
+            if changed:
+                return changed
+
+class InotifyWatcher:
+    """
+    Finds changed Verilog files with Linux inotify (through libc, no extra packages).
+
+    Raises: OSError if inotify is not available
+    """
+    name = "inotify"
+
+    # Flags from <sys/inotify.h>
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Key: watch descriptor, Value: watched directory
+        self._directories: Dict[int, Path] = {}
+
+    def watch(self, directories: Iterable[Path]) -> None:
+        """Adds watches for directories that are not watched yet (not recursively)."""
+        watched = set(self._directories.values())
+        for directory in directories:
+            if directory in watched:
+                continue
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), self.WATCH_MASK)
+            if wd >= 0:
+                self._directories[wd] = directory
+
+    def _read_events(self, changed: Set[Path]) -> bool:
+        """
+        Adds the Verilog files named by the pending events to changed.
+
+        Returns: False if events were lost, so the caller cannot know what changed
+        """
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return True
+        complete = True
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                complete = False
+            elif mask & self.IN_IGNORED:
+                self._directories.pop(wd, None)
+            elif wd in self._directories and (mask & self.IN_ISDIR or _is_verilog(name)):
+                changed.add(self._directories[wd] / name)
+        return complete
+
+    def wait(self) -> Optional[Set[Path]]:
+        """
+        Blocks until Verilog files were created, changed or deleted.
+
+        Returns: The changed files (and created or removed directories)
+        Returns: None if the kernel dropped events, so everything has to be checked
+        """
+        changed: Set[Path] = set()
+        complete = True
+        while not changed and complete:
+            select.select([self.fd], [], [])
+            complete = self._read_events(changed)
+            # Collect the rest of a burst of events
+            while select.select([self.fd], [], [], DEBOUNCE)[0]:
+                complete = self._read_events(changed) and complete
+        return changed if complete else None
+
+def make_watcher():
+    """Returns: An inotify watcher if the platform supports it, a polling watcher otherwise."""
+    try:
+        return InotifyWatcher()
+    except (OSError, AttributeError):
+        return PollingWatcher()
+
+#--------------------
+# Watch session
+#--------------------
+
+class WatchSession:
+    """
+    Keeps track of what every test bench depends on and relints the affected
+    ones when files change.
+
+    expand_targets: Returns the test benches to lint (re-run every round so new ones are found)
+    resolve_target: Returns the path of a test bench, or None if it does not exist
+    lint_target: Lints one test bench, returning (file, status, stdout text, stderr text, ...)
+    """
+    def __init__(self, targets: List[str], include_dir: List[str],
+                 expand_targets: Callable[[], List[str]],
+                 resolve_target: Callable[[str], Optional[str]],
+                 lint_target: Callable[[str], Tuple]):
+        self.targets = targets
+        self.include_dir = include_dir
+        self.expand_targets = expand_targets
+        self.resolve_target = resolve_target
+        self.lint_target = lint_target
+        # Key: test bench, Value: resolved paths of every file its lint depends on
+        self.dependencies: Dict[str, Set[Path]] = {}
+        # Key: test bench, Value: names of included files that could not be found
+        self.missing: Dict[str, Set[str]] = {}
+
+    def directories(self) -> Set[Path]:
+        """
+        Returns: Every directory with a file some test bench depends on, every target
+                 directory and every existing directory a missing include could appear in
+        """
+        directories = set()
+        for target in self.targets:
+            for base in self.include_dir:
+                root = os.path.join(base, target)
+                if os.path.isdir(root):
+                    for dirpath, dirnames, _ in os.walk(root):
+                        dirnames[:] = [name for name in dirnames if not name.startswith(".")]
+                        directories.add(Path(dirpath).resolve())
+                    break
+        for paths in self.dependencies.values():
+            directories.update(path.parent for path in paths)
+        for names in self.missing.values():
+            for name in names:
+                for base in self.include_dir:
+                    directory = Path(base, name).parent
+                    if directory.is_dir():
+                        directories.add(directory.resolve())
+        return directories
+
+    def _update_dependencies(self, file) -> None:
+        path = self.resolve_target(file)
+        if path is None:
+            self.dependencies.pop(file, None)
+            self.missing.pop(file, None)
+        else:
+            closure, missing = source_closure(Path(path), self.include_dir)
+            self.dependencies[file] = set(closure)
+            self.missing[file] = missing
+
+    def _creates_missing(self, file, changed: Set[Path]) -> bool:
+        """Returns: True if one of the changed paths is an include file that was missing (matched by name)"""
+        names = self.missing.get(file)
+        if not names:
+            return False
+        return any(path.as_posix().endswith("/" + name.lstrip("/")) for path in changed for name in names)
+
+    def affected(self, changed: Optional[Set[Path]]) -> List[str]:
+        """
+        Returns: The test benches to relint after changed files were saved, in sorted order.
+                 Everything is relinted if changed is None.
+        """
+        files = self.expand_targets()
+        known = set(self.dependencies)
+        for file in known - set(files):
+            del self.dependencies[file]
+            self.missing.pop(file, None)
+        if changed is None:
+            return sorted(files)
+        return sorted(file for file in files
+                      if file not in known or self.dependencies.get(file, set()) & changed
+                      or self._creates_missing(file, changed))
+
+    def lint(self, files: List[str]) -> None:
+        """Lints files, printing the output of the failing ones and a one line summary."""
+        started = time.perf_counter()
+        failed = 0
+        for file in files:
+            self._update_dependencies(file)
+            file, status, out, err = self.lint_target(file)[:4]
+            if out or err:
+                print(f"\033[1m{file}:\033[0m")
+                sys.stdout.write(out)
+                sys.stdout.flush()
+                sys.stderr.write(err)
+                sys.stderr.flush()
+            failed += status != 0
+        elapsed = (time.perf_counter() - started) * 1000
+        status = f"\033[91m{failed} failed\033[0m" if failed else "\033[32mall clean\033[0m"
+        print(f"ece2300-lint: linted {len(files)} test bench(es) in {elapsed:.0f} ms, {status}", file=sys.stderr)
+
+    def run(self, watcher=None) -> None:
+        """Lints every test bench, then relints the affected ones on every change until Ctrl-C."""
+        watcher = watcher or make_watcher()
+        try:
+            self.lint(self.affected(None))
+            while True:
+                directories = self.directories()
+                watcher.watch(directories)
+                print(f"ece2300-lint: watching {len(self.dependencies)} test bench(es) in "
+                      f"{len(directories)} directories ({watcher.name}), Ctrl-C to stop", file=sys.stderr)
+                changed = watcher.wait()
+                # Includes may now resolve to files that were just created or deleted
+                SESSION_RESOLVER.clear()
+                files = self.affected(changed)
+                if changed is not None:
+                    names = ", ".join(sorted(path.name for path in changed))
+                    print(f"\nece2300-lint: changed: {names}", file=sys.stderr)
+                if files:
+                    self.lint(files)
+        except KeyboardInterrupt:
+            pass